@@ -0,0 +1,79 @@
+"""Contention benchmark: N processes writing to the same dataset at once.
+
+Each writer inserts records one at a time and increments a shared counter
+record with a read-modify-write, so lost updates or duplicate IDs show up
+as a mismatch in the final check.
+
+    python bench_concurrency.py --backend sqlite --ops 200
+"""
+import os
+import time
+import shutil
+import argparse
+import tempfile
+from multiprocessing import Process
+
+from storage import open_storage
+
+SAMPLE = {
+    "Date": "2024-01-01", "CustomerName": "Bench User", "Email": "bench@example.com",
+    "Phone": "9999999999", "Product": "Pen", "Category": "Stationery", "Quantity": 1,
+    "PricePerUnit": 10.0, "TotalAmount": 10.0, "PaymentMethod": "UPI",
+    "ShippingAddress": "Pune", "Status": "Paid",
+}
+
+
+def open_bench_storage(workdir, backend):
+    return open_storage(backend,
+                        os.path.join(workdir, "sales_data.csv"),
+                        os.path.join(workdir, "sales_data.db"),
+                        os.path.join(workdir, "sales_data.journal"))
+
+
+def writer(workdir, backend, ops):
+    storage = open_bench_storage(workdir, backend)
+    for _ in range(ops):
+        storage.insert(SAMPLE)
+        with storage.transaction():
+            counter = storage.get(1)
+            storage.update(1, {"Quantity": int(counter["Quantity"]) + 1})
+    storage.close()
+
+
+def run(backend, writers, ops):
+    workdir = tempfile.mkdtemp(prefix="sales_bench_")
+    try:
+        storage = open_bench_storage(workdir, backend)
+        storage.insert({**SAMPLE, "CustomerName": "Counter", "Quantity": 0})
+        storage.close()
+
+        procs = [Process(target=writer, args=(workdir, backend, ops)) for _ in range(writers)]
+        start = time.perf_counter()
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+        storage = open_bench_storage(workdir, backend)
+        df = storage.load()
+        counter = storage.get(1)["Quantity"]
+        storage.close()
+        expected = writers * ops
+        ok = (len(df) == expected + 1 and df['ID'].is_unique and counter == expected)
+        # Each op is one insert plus one read-modify-write update
+        print(f"{backend:8} writers={writers:<3} ops/s={2 * expected / elapsed:10.1f} "
+              f"rows={len(df) - 1}/{expected} counter={counter}/{expected} "
+              f"{'OK' if ok else 'LOST UPDATES'}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["sqlite", "journal", "csv"], default="sqlite")
+    parser.add_argument("--ops", type=int, default=200, help="inserts (and counter updates) per writer")
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+    for n in args.writers:
+        run(args.backend, n, args.ops)
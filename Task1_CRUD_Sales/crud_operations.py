@@ -1,11 +1,24 @@
+import sys
+import argparse
+from datetime import datetime
+from functools import partial
 import pandas as pd
-import os
 from tabulate import tabulate
 from colorama import Fore, init
+from storage import COLUMNS, open_storage
+from schema import DATE_FORMAT, to_plain
 init()
 
 # Constants
+REQUIRED_FIELDS = [col for col in COLUMNS if col not in ("ID", "TotalAmount")]
 FILE = "sales_data.csv"
+DB_FILE = "sales_data.db"
+JOURNAL_FILE = "sales_data.journal"
+INDEX_FILE = "sales_data.idx"  # persisted search indexes; set to None to keep them in memory only
+PAGE_SIZE = 20  # rows per screen; only one page is fetched and formatted at a time
+BACKEND = "sqlite"  # "sqlite" (indexed, default), "journal" (CSV snapshot + append-only log) or "csv" (legacy full-file rewrite)
+
+_storage = None
 
 # Helper Functions
 def get_valid_input(prompt, input_type=str, allow_blank=False):
@@ -18,38 +31,69 @@ def get_valid_input(prompt, input_type=str, allow_blank=False):
         except ValueError:
             print(Fore.RED + f"⚠️ Invalid input! Please enter a {input_type.__name__}." + Fore.RESET)
 
-def show_records(df):
-    if df.empty:
+def date(text):
+    """A YYYY-MM-DD date, as entered; anything else raises ValueError"""
+    datetime.strptime(text, DATE_FORMAT)
+    return text
+
+def iter_pages(records, page_size=PAGE_SIZE, limit=None, offset=0):
+    """Yield results a page at a time; `records` is a DataFrame or a fetch(limit, offset) callable"""
+    if isinstance(records, pd.DataFrame):
+        frame = records
+        records = lambda limit, offset: frame.iloc[offset:offset + limit]
+    end = None if limit is None else offset + limit
+    while end is None or offset < end:
+        size = page_size if end is None else min(page_size, end - offset)
+        page = records(limit=size, offset=offset)
+        if page.empty:
+            return
+        yield page
+        if len(page) < size:
+            return
+        offset += len(page)
+
+def show_records(records, page_size=PAGE_SIZE, interactive=True, limit=None, offset=0):
+    shown = 0
+    for page in iter_pages(records, page_size, limit, offset):
+        # The next page is fetched before asking, so the prompt only appears when there is more
+        if shown and interactive:
+            answer = input(Fore.CYAN + f"-- {shown} rows shown. Enter for more, q to stop: " + Fore.RESET)
+            if answer.strip().lower() == "q":
+                return
+        print(tabulate(to_plain(page), headers='keys', tablefmt='grid', showindex=False))
+        shown += len(page)
+    if not shown:
         print(Fore.YELLOW + "No records found." + Fore.RESET)
-    else:
-        print(tabulate(df, headers='keys', tablefmt='grid', showindex=False))
+
+def get_storage():
+    global _storage
+    if _storage is None:
+        _storage = open_storage(BACKEND, FILE, DB_FILE, JOURNAL_FILE, INDEX_FILE)
+    return _storage
 
 # Core CRUD Functions
 def load_data():
-    if os.path.exists(FILE):
-        df = pd.read_csv(FILE, dtype={'Phone': str})
-        df['ID'] = df['ID'].astype(int)
-        return df
+    storage = get_storage()
+    if storage.exists():
+        return storage.load()
     else:
         print(Fore.YELLOW + "No existing dataset found. Starting with empty database." + Fore.RESET)
-        return pd.DataFrame(columns=[
-            "ID", "Date", "CustomerName", "Email", "Phone", "Product", 
-            "Category", "Quantity", "PricePerUnit", "TotalAmount", 
-            "PaymentMethod", "ShippingAddress", "Status"
-        ])
+        return pd.DataFrame(columns=COLUMNS)
 
 def save_data(df):
-    df.to_csv(FILE, index=False)
+    get_storage().replace(df)
     print(Fore.GREEN + "✅ Data saved successfully!" + Fore.RESET)
 
+def export_data(path=FILE):
+    get_storage().export_csv(path)
+    print(Fore.GREEN + f"✅ Data exported to {path}" + Fore.RESET)
+
 def create_record():
-    df = load_data()
-    new_id = df['ID'].max() + 1 if not df.empty else 1
+    storage = get_storage()
 
     print(Fore.CYAN + "\n➕ Add New Sale Record" + Fore.RESET)
     new_record = {
-        "ID": new_id,
-        "Date": get_valid_input("Date (YYYY-MM-DD): ", str),
+        "Date": get_valid_input("Date (YYYY-MM-DD): ", date),
         "CustomerName": get_valid_input("Customer Name: ", str),
         "Email": get_valid_input("Email: ", str),
         "Phone": get_valid_input("Phone: ", str),
@@ -63,13 +107,12 @@ def create_record():
     }
     new_record["TotalAmount"] = new_record["Quantity"] * new_record["PricePerUnit"]
 
-    df = pd.concat([df, pd.DataFrame([new_record])], ignore_index=True)
-    save_data(df)
+    new_id = storage.insert(new_record)
     print(Fore.GREEN + f"✅ Record with ID {new_id} added successfully!" + Fore.RESET)
 
 def read_records():
-    df = load_data()
-    if df.empty:
+    storage = get_storage()
+    if not storage.exists():
         print(Fore.YELLOW + "No records available to search." + Fore.RESET)
         return
 
@@ -84,85 +127,179 @@ def read_records():
     
     if choice == 1:
         id_val = get_valid_input("Enter ID: ", int)
-        result = df[df['ID'] == id_val]
+        record = storage.get(id_val)
+        result = pd.DataFrame([record] if record else [], columns=COLUMNS)
     elif choice == 2:
         name = get_valid_input("Enter Customer Name: ", str)
-        result = df[df['CustomerName'].str.contains(name, case=False)]
+        result = partial(storage.search, 'CustomerName', name)
     elif choice == 3:
         product = get_valid_input("Enter Product: ", str)
-        result = df[df['Product'].str.contains(product, case=False)]
+        result = partial(storage.search, 'Product', product)
     elif choice == 4:
-        start_date = get_valid_input("Start Date (YYYY-MM-DD): ", str)
-        end_date = get_valid_input("End Date (YYYY-MM-DD): ", str)
-        result = df[(df['Date'] >= start_date) & (df['Date'] <= end_date)]
+        start_date = get_valid_input("Start Date (YYYY-MM-DD): ", date)
+        end_date = get_valid_input("End Date (YYYY-MM-DD): ", date)
+        result = partial(storage.date_range, start_date, end_date)
     elif choice == 5:
         category = get_valid_input("Enter Category: ", str)
-        result = df[df['Category'].str.contains(category, case=False)]
+        result = partial(storage.search, 'Category', category)
     else:
         print(Fore.RED + "⚠️ Invalid choice. Showing all records." + Fore.RESET)
-        result = df
+        result = storage.load()
     
     print(Fore.CYAN + "\n📄 Search Results:" + Fore.RESET)
     show_records(result)
 
 def update_record():
-    df = load_data()
-    if df.empty:
+    storage = get_storage()
+    if not storage.exists():
         print(Fore.YELLOW + "No records available to update." + Fore.RESET)
         return
 
     id_val = get_valid_input("\nEnter ID to update: ", int)
-    if id_val not in df['ID'].values:
+    record = storage.get(id_val)
+    if record is None:
         print(Fore.RED + "⚠️ Record not found." + Fore.RESET)
         return
 
-    record = df[df['ID'] == id_val].iloc[0]
     print(Fore.CYAN + "\n✏️ Editing Record ID", id_val, Fore.RESET)
     print("Leave field blank to keep current value.")
     
-    for col in df.columns:
-        if col == "ID": continue
+    changes = {}
+    for col in COLUMNS:
+        if col in ("ID", "TotalAmount"): continue
         current_val = record[col]
         new_val = get_valid_input(f"{col} (Current: {current_val}): ", str, allow_blank=True)
         if new_val is not None:
-            if col in ["Quantity"]:
-                df.loc[df['ID'] == id_val, col] = int(new_val)
-            elif col in ["PricePerUnit", "TotalAmount"]:
-                df.loc[df['ID'] == id_val, col] = float(new_val)
-            else:
-                df.loc[df['ID'] == id_val, col] = new_val
-
-    # Recalculate TotalAmount
-    quantity = df.loc[df['ID'] == id_val, "Quantity"].values[0]
-    price = df.loc[df['ID'] == id_val, "PricePerUnit"].values[0]
-    df.loc[df['ID'] == id_val, "TotalAmount"] = quantity * price
+            changes[col] = new_val
+    if not changes:
+        print(Fore.YELLOW + "No changes made." + Fore.RESET)
+        return
 
-    save_data(df)
-    print(Fore.GREEN + f"✅ Record ID {id_val} updated successfully!" + Fore.RESET)
+    # Validation and TotalAmount recalculation happen in the batch update path
+    updated, rejected = update_records({id_val: changes})
+    if len(rejected):
+        print(Fore.RED + "⚠️ Invalid Date, Quantity or Price. Record not updated." + Fore.RESET)
+    elif not updated:
+        print(Fore.RED + "⚠️ Record was deleted by another user." + Fore.RESET)
+    else:
+        print(Fore.GREEN + f"✅ Record ID {id_val} updated successfully!" + Fore.RESET)
 
 def delete_record():
-    df = load_data()
-    if df.empty:
+    storage = get_storage()
+    if not storage.exists():
         print(Fore.YELLOW + "No records available to delete." + Fore.RESET)
         return
 
     id_val = get_valid_input("\nEnter ID to delete: ", int)
-    if id_val not in df['ID'].values:
+    record = storage.get(id_val)
+    if record is None:
         print(Fore.RED + "⚠️ Record not found." + Fore.RESET)
         return
 
-    record = df[df['ID'] == id_val].iloc[0]
     print(Fore.RED + "\n❌ Confirm Deletion:" + Fore.RESET)
     show_records(pd.DataFrame([record]))
     
     confirm = input("Are you sure you want to delete this record? (y/n): ").lower()
     if confirm == 'y':
-        df = df[df['ID'] != id_val]
-        save_data(df)
+        storage.delete(id_val)
         print(Fore.GREEN + f"✅ Record ID {id_val} deleted successfully!" + Fore.RESET)
     else:
         print(Fore.YELLOW + "Deletion cancelled." + Fore.RESET)
 
+# Bulk API (non-interactive)
+def read_input(path, fmt=None):
+    """Read records from a CSV or JSON Lines file, or from stdin when path is '-'"""
+    if fmt is None:
+        fmt = "jsonl" if str(path).endswith((".jsonl", ".json")) else "csv"
+    source = sys.stdin if path == "-" else path
+    if fmt == "jsonl":
+        df = pd.read_json(source, lines=True, dtype=False)
+    else:
+        df = pd.read_csv(source, dtype=str, keep_default_na=False, na_values=[""])
+    if "Phone" in df.columns:
+        df["Phone"] = df["Phone"].where(df["Phone"].isna(), df["Phone"].astype(str))
+    return df
+
+def validate_records(df, required=()):
+    """Coerce types column-wise and split rows into (valid, rejected)"""
+    missing = [col for col in required if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    df = df.copy()
+    bad = pd.Series(False, index=df.index)
+    if "ID" in df.columns:
+        df["ID"] = pd.to_numeric(df["ID"], errors="coerce")
+        bad |= df["ID"].isna()
+    if "Date" in df.columns:
+        parsed = pd.to_datetime(df["Date"], format=DATE_FORMAT, errors="coerce")
+        bad |= parsed.isna() & df["Date"].notna()
+    for col in ("Quantity", "PricePerUnit"):
+        if col in df.columns:
+            values = pd.to_numeric(df[col], errors="coerce")
+            bad |= values.isna() & df[col].notna()
+            df[col] = values
+    if "Quantity" in df.columns:
+        bad |= df["Quantity"].notna() & (df["Quantity"] % 1 != 0)
+    bad |= df[list(required)].isna().any(axis=1) if required else False
+    valid = df[~bad].copy()
+    if "ID" in valid.columns:
+        valid["ID"] = valid["ID"].astype(int)
+    if "Quantity" in valid.columns and not valid["Quantity"].isna().any():
+        valid["Quantity"] = valid["Quantity"].astype(int)
+    return valid, df[bad]
+
+def bulk_insert(df):
+    """Validate, price and insert many records in one write; returns (ids, rejected)"""
+    valid, rejected = validate_records(df, REQUIRED_FIELDS)
+    valid = valid.reindex(columns=COLUMNS).drop(columns="ID")
+    valid["TotalAmount"] = valid["Quantity"] * valid["PricePerUnit"]
+    ids = get_storage().insert_many(valid) if not valid.empty else []
+    return ids, rejected
+
+def bulk_update(df):
+    """Apply per-ID field changes in one write; blank cells keep the current value"""
+    valid, rejected = validate_records(df, ["ID"])
+    fields = [col for col in valid.columns if col in COLUMNS and col not in ("ID", "TotalAmount")]
+    if valid.empty or not fields:
+        return 0, rejected
+    storage = get_storage()
+    # Read and write in one transaction so concurrent edits cannot be lost
+    with storage.transaction():
+        current = storage.get_many(valid["ID"].tolist()).set_index("ID")
+        changes = valid.drop_duplicates("ID", keep="last").set_index("ID")[fields]
+        changes = changes[changes.index.isin(current.index)]
+        updated = current.loc[changes.index].copy()
+        for col in fields:
+            updated[col] = changes[col].where(changes[col].notna(), updated[col])
+        # Recompute TotalAmount for the whole batch at once
+        updated["Quantity"] = updated["Quantity"].astype(int)
+        updated["PricePerUnit"] = updated["PricePerUnit"].astype(float)
+        updated["TotalAmount"] = updated["Quantity"] * updated["PricePerUnit"]
+        count = storage.update_many(updated.reset_index()[["ID", *fields, "TotalAmount"]])
+    return count, rejected
+
+def update_records(changes_by_id):
+    """Apply {ID: {field: value}} edits as one batch; returns (updated_count, rejected)"""
+    rows = [{"ID": record_id, **fields} for record_id, fields in changes_by_id.items()]
+    return bulk_update(pd.DataFrame(rows))
+
+def bulk_delete(ids):
+    return get_storage().delete_many([int(i) for i in ids])
+
+def query_records(record_id=None, name=None, product=None, category=None,
+                  start_date=None, end_date=None, limit=None, offset=0):
+    """Records matching every given filter, optionally only the `limit` rows after `offset`"""
+    storage = get_storage()
+    if record_id is not None:
+        record = storage.get(record_id)
+        result = pd.DataFrame([record] if record else [], columns=COLUMNS)
+        return result.iloc[offset:None if limit is None else offset + limit]
+    text_filters = [(column, text) for column, text in
+                    (("CustomerName", name), ("Product", product), ("Category", category)) if text]
+    dates = (start_date or "0000-01-01", end_date or "9999-12-31") if start_date or end_date else None
+    # The matching IDs are found once and reused by later pages, which read only their own rows
+    return storage.select(text_filters, dates, limit=limit, offset=offset)
+
 # Main Menu
 def main():
     print(Fore.BLUE + "\n=== SALES DATA MANAGER ===" + Fore.RESET)
@@ -174,9 +311,10 @@ def main():
         print("2. 🔍 Search Sales")
         print("3. ✏️ Update Sale")
         print("4. ❌ Delete Sale")
-        print("5. 🚪 Exit")
+        print("5. 📤 Export to CSV")
+        print("6. 🚪 Exit")
         
-        choice = get_valid_input("\nChoose an option (1-5): ", int)
+        choice = get_valid_input("\nChoose an option (1-6): ", int)
         
         if choice == 1:
             create_record()
@@ -187,10 +325,88 @@ def main():
         elif choice == 4:
             delete_record()
         elif choice == 5:
+            export_data()
+        elif choice == 6:
             print(Fore.BLUE + "\nThank you for using Sales Data Manager. Goodbye!" + Fore.RESET)
+            get_storage().close()
             break
         else:
-            print(Fore.RED + "⚠️ Invalid choice. Please enter 1-5." + Fore.RESET)
+            print(Fore.RED + "⚠️ Invalid choice. Please enter 1-6." + Fore.RESET)
+
+# Command Line Interface
+def build_parser():
+    parser = argparse.ArgumentParser(description="Sales Data Manager (no arguments starts the interactive menu)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (("bulk-insert", "insert records from a CSV/JSONL file"),
+                            ("bulk-update", "update records by ID from a CSV/JSONL file"),
+                            ("bulk-delete", "delete the IDs listed in a CSV/JSONL file")):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("file", help="input file, or '-' for stdin")
+        cmd.add_argument("--format", choices=["csv", "jsonl"], help="input format (default: from extension)")
+
+    query = sub.add_parser("query", help="print records matching the filters")
+    query.add_argument("--id", type=int)
+    query.add_argument("--name")
+    query.add_argument("--product")
+    query.add_argument("--category")
+    query.add_argument("--start", help="start date YYYY-MM-DD")
+    query.add_argument("--end", help="end date YYYY-MM-DD")
+    query.add_argument("--format", choices=["table", "csv", "jsonl"], default="table")
+    query.add_argument("--limit", type=int, help="return at most this many records")
+    query.add_argument("--offset", type=int, default=0, help="skip this many matching records first")
+    query.add_argument("--page-size", type=int, default=5000, help="records fetched per read")
+    return parser
+
+def report(message, color=Fore.GREEN):
+    # Status goes to stderr so query output can be piped
+    print(color + message + Fore.RESET, file=sys.stderr)
+
+def run_cli(argv):
+    args = build_parser().parse_args(argv)
+    try:
+        if args.command == "query":
+            fetch = partial(query_records, args.id, args.name, args.product, args.category, args.start, args.end)
+            if args.format == "table":
+                show_records(fetch, args.page_size, interactive=False, limit=args.limit, offset=args.offset)
+                return 0
+            # Stream page by page so the first rows appear before the whole result is read
+            header = True
+            for page in iter_pages(fetch, args.page_size, args.limit, args.offset):
+                # One write per page: colorama's stdout wrapper is slow per line
+                if args.format == "csv":
+                    sys.stdout.write(to_plain(page).to_csv(index=False, header=header))
+                    header = False
+                else:
+                    sys.stdout.write(to_plain(page).to_json(orient="records", lines=True))
+                sys.stdout.flush()
+            if header and args.format == "csv":
+                print(",".join(COLUMNS))
+            return 0
+
+        df = read_input(args.file, args.format)
+        if args.command == "bulk-insert":
+            ids, rejected = bulk_insert(df)
+            report(f"✅ Inserted {len(ids)} records" + (f" (IDs {ids[0]}-{ids[-1]})" if ids else ""))
+        elif args.command == "bulk-update":
+            updated, rejected = bulk_update(df)
+            report(f"✅ Updated {updated} records")
+        else:
+            if "ID" not in df.columns:
+                raise ValueError("Missing columns: ID")
+            rejected = df[pd.to_numeric(df["ID"], errors="coerce").isna()]
+            deleted = bulk_delete(pd.to_numeric(df["ID"], errors="coerce").dropna())
+            report(f"✅ Deleted {deleted} records")
+        if len(rejected):
+            report(f"⚠️ Skipped {len(rejected)} invalid rows", Fore.YELLOW)
+        return 0
+    except ValueError as e:
+        report(f"⚠️ {e}", Fore.RED)
+        return 1
+    finally:
+        get_storage().close()
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
     main()
\ No newline at end of file
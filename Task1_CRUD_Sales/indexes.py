@@ -0,0 +1,169 @@
+import os
+import pickle
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from schema import date_text, plain_value
+
+# Columns answered by case-insensitive substring search
+TEXT_COLUMNS = ["CustomerName", "Product", "Category"]
+NGRAM = 3
+
+
+def _key(value):
+    # Missing values (None / NaN) never match a search
+    if value is None or value != value:
+        return ""
+    return str(value).lower()
+
+
+def _date_key(value):
+    # Missing dates key as "", before every real date, so no range matches them
+    value = plain_value(value)
+    return "" if value is None else str(value)
+
+
+def ngrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class DateIndex:
+    """Sorted (Date, ID) pairs so range queries are two binary searches"""
+
+    def __init__(self):
+        self.keys = []
+
+    def add(self, date, record_id):
+        insort(self.keys, (_date_key(date), record_id))
+
+    def remove(self, date, record_id):
+        key = (_date_key(date), record_id)
+        pos = bisect_left(self.keys, key)
+        if pos < len(self.keys) and self.keys[pos] == key:
+            del self.keys[pos]
+
+    def range(self, start_date, end_date):
+        lo = bisect_left(self.keys, (str(start_date),))
+        # (end, inf) sorts after every (end, id) pair
+        hi = bisect_right(self.keys, (str(end_date), float('inf')))
+        return [record_id for _, record_id in self.keys[lo:hi]]
+
+
+class NgramIndex:
+    """Inverted index from lower-cased trigrams to the distinct values containing them.
+
+    Values map to the IDs holding them, so columns with few distinct values
+    (Category, Product) stay tiny no matter how many rows exist.
+    """
+
+    def __init__(self):
+        self.values = defaultdict(set)   # lower-cased value -> IDs
+        self.grams = defaultdict(set)    # trigram -> lower-cased values
+
+    def build(self, values, ids):
+        for value, record_id in zip(values, ids):
+            self.values[_key(value)].add(record_id)
+        # Trigrams are generated once per distinct value, not once per row
+        for key in self.values:
+            for gram in ngrams(key):
+                self.grams[gram].add(key)
+
+    def add(self, value, record_id):
+        key = _key(value)
+        if key not in self.values:
+            for gram in ngrams(key):
+                self.grams[gram].add(key)
+        self.values[key].add(record_id)
+
+    def remove(self, value, record_id):
+        key = _key(value)
+        ids = self.values.get(key)
+        if ids is None:
+            return
+        ids.discard(record_id)
+        if not ids:
+            del self.values[key]
+            for gram in ngrams(key):
+                self.grams[gram].discard(key)
+                if not self.grams[gram]:
+                    del self.grams[gram]
+
+    def search(self, text):
+        text = text.lower()
+        if len(text) < NGRAM:
+            candidates = self.values.keys()
+        else:
+            # Intersect from the rarest trigram up to keep the working set small
+            posting = sorted((self.grams.get(g, set()) for g in ngrams(text)), key=len)
+            candidates = set(posting[0]).intersection(*posting[1:])
+        ids = []
+        for key in candidates:
+            if text in key:
+                ids.extend(self.values[key])
+        return ids
+
+
+class SearchIndex:
+    """Secondary indexes over Date and the text columns, kept in step with every mutation"""
+
+    def __init__(self):
+        self.date = DateIndex()
+        self.text = {col: NgramIndex() for col in TEXT_COLUMNS}
+
+    @classmethod
+    def build(cls, df):
+        index = cls()
+        ids = [int(i) for i in df['ID']]
+        # One sort for the whole dataset instead of an insort per row
+        index.date.keys = sorted(zip(date_text(df['Date']), ids))
+        for col, col_index in index.text.items():
+            col_index.build(df[col], ids)
+        return index
+
+    def add(self, record):
+        record_id = int(record["ID"])
+        self.date.add(record["Date"], record_id)
+        for col, col_index in self.text.items():
+            col_index.add(record[col], record_id)
+
+    def remove(self, record):
+        record_id = int(record["ID"])
+        self.date.remove(record["Date"], record_id)
+        for col, col_index in self.text.items():
+            col_index.remove(record[col], record_id)
+
+    def search(self, column, text):
+        return sorted(self.text[column].search(text))
+
+    def date_range(self, start_date, end_date):
+        return sorted(self.date.range(start_date, end_date))
+
+    def select(self, text_filters=(), dates=None):
+        """Sorted IDs matching every (column, text) filter and the (start, end) date range.
+
+        With no filters at all every ID matches; the date index holds them all.
+        """
+        matches = [set(self.date.range(*dates))] if dates else []
+        matches += [set(self.text[column].search(text)) for column, text in text_filters]
+        if not matches:
+            return sorted(record_id for _, record_id in self.date.keys)
+        # Intersect from the smallest match set up
+        matches.sort(key=len)
+        return sorted(matches[0].intersection(*matches[1:]))
+
+    # Optional persistence, validated against the storage signature
+    def save(self, path, signature):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((signature, self), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path, signature):
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                saved_signature, index = pickle.load(f)
+        except Exception:
+            return None
+        return index if saved_signature == signature else None
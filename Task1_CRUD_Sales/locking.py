@@ -0,0 +1,54 @@
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Exclusive inter-process lock on `<path>.lock`.
+
+    Re-entrant within one object, so an operation that already holds the
+    lock can call other locked operations.
+    """
+
+    def __init__(self, path):
+        self.lock_path = path + ".lock"
+        self.depth = 0
+        self.handle = None
+
+    def acquire(self):
+        if self.depth == 0:
+            self.handle = open(self.lock_path, 'a+b')
+            if fcntl is not None:
+                fcntl.flock(self.handle.fileno(), fcntl.LOCK_EX)
+            else:
+                self.handle.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(self.handle.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK gives up after ~10 s; keep waiting
+                        time.sleep(0.05)
+        self.depth += 1
+
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+            else:
+                self.handle.seek(0)
+                msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+            self.handle.close()
+            self.handle = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
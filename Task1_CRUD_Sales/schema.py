@@ -0,0 +1,122 @@
+import os
+import pickle
+import pandas as pd
+
+# Dataset layout shared by every storage engine
+COLUMNS = [
+    "ID", "Date", "CustomerName", "Email", "Phone", "Product",
+    "Category", "Quantity", "PricePerUnit", "TotalAmount",
+    "PaymentMethod", "ShippingAddress", "Status"
+]
+
+# Low-cardinality text columns, stored once per distinct value
+CATEGORICAL = ["Product", "Category", "PaymentMethod", "Status"]
+
+NUMERIC_DTYPES = {
+    "ID": "int64",
+    "Quantity": "int32",
+    "PricePerUnit": "float64",
+    "TotalAmount": "float64",
+}
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def empty_frame():
+    return apply_schema(pd.DataFrame(columns=COLUMNS))
+
+
+def apply_schema(df):
+    """Compact, typed in-memory frame: categoricals, datetime64 Date, fixed-width numbers"""
+    df = df.reindex(columns=COLUMNS)
+    df["Date"] = parse_dates(df["Date"])
+    for col, dtype in NUMERIC_DTYPES.items():
+        values = pd.to_numeric(df[col], errors="coerce")
+        # Integer columns fall back to float when values are missing
+        df[col] = values.astype(dtype) if values.notna().all() else values
+    for col in CATEGORICAL:
+        df[col] = df[col].astype("category")
+    df["Phone"] = df["Phone"].where(df["Phone"].isna(), df["Phone"].astype(str))
+    return df
+
+
+def parse_dates(values):
+    """datetime64 when every present value is a YYYY-MM-DD date, otherwise the values as entered"""
+    parsed = pd.to_datetime(values, format=DATE_FORMAT, errors="coerce")
+    if (parsed.isna() & values.notna()).any():
+        # Coercing would turn the other dates into NaT, and saving would then erase them
+        return values.astype(object)
+    return parsed
+
+
+def date_text(dates):
+    """A Date column as comparable strings, with "" for missing dates"""
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        dates = dates.dt.strftime(DATE_FORMAT)
+    # Blank the missing values before the cast, which would otherwise turn them into "nan"/"None" on some pandas versions
+    return dates.where(dates.notna(), "").astype(str)
+
+
+def plain_value(value):
+    """Python scalar suitable for sqlite3 / JSON (None for missing, 'YYYY-MM-DD' for dates)"""
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.strftime(DATE_FORMAT)
+    # sqlite3 cannot bind NumPy scalars such as int64
+    return value.item() if hasattr(value, "item") else value
+
+
+def to_plain(df):
+    """Inverse of apply_schema for display and export: string dates and plain object columns"""
+    df = df.copy()
+    if pd.api.types.is_datetime64_any_dtype(df["Date"]):
+        df["Date"] = df["Date"].dt.strftime(DATE_FORMAT)
+    for col in CATEGORICAL:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+    return df
+
+
+# CSV parsing with a binary cache
+def _cache_path(path):
+    return path + ".cache"
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _parse_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        first_line = f.readline()
+    # Files saved without a header row are still accepted
+    header = "infer" if first_line.split(",")[0].strip() == "ID" else None
+    names = None if header == "infer" else COLUMNS
+    df = pd.read_csv(path, header=header, names=names, dtype={"Phone": str},
+                     parse_dates=False)
+    if df.empty:
+        return empty_frame()
+    return apply_schema(df)
+
+
+def read_csv_file(path, use_cache=True):
+    """Read a sales CSV as a typed frame, reusing the parsed copy while the CSV is unchanged"""
+    cache_path = _cache_path(path)
+    signature = _signature(path)
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                cached_signature, df = pickle.load(f)
+            if cached_signature == signature:
+                return df
+        except Exception:
+            pass
+    df = _parse_csv(path)
+    if use_cache:
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((signature, df), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    return df
@@ -0,0 +1,712 @@
+import os
+import json
+import sqlite3
+import uuid
+from contextlib import contextmanager
+import pandas as pd
+from indexes import SearchIndex
+from locking import FileLock
+from schema import COLUMNS, apply_schema, date_text, empty_frame, plain_value, read_csv_file, to_plain
+
+SQL_TYPES = {
+    "ID": "INTEGER PRIMARY KEY",
+    "Quantity": "INTEGER",
+    "PricePerUnit": "REAL",
+    "TotalAmount": "REAL",
+}
+
+TABLE = "sales"
+META_TABLE = "sales_meta"
+BUSY_TIMEOUT = 60  # seconds a writer waits for another process's transaction
+
+
+# Helpers
+def write_csv_atomic(df, path):
+    """Write to a temp file and rename over the target so readers never see a partial file"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        df[COLUMNS].to_csv(f, index=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def frame_records(df):
+    """DataFrame rows as plain dicts with missing values as None"""
+    return [{col: plain_value(value) for col, value in rec.items()} for rec in df.to_dict('records')]
+
+
+def id_positions(df, record_ids):
+    """Row positions of the given IDs (-1 when absent), via one hash lookup for the batch"""
+    return pd.Index(df['ID']).get_indexer(pd.Index(record_ids, dtype="int64"))
+
+
+def _row_values(record, columns):
+    return [plain_value(record.get(col)) for col in columns]
+
+
+# Engine 1: plain CSV (whole-file read/rewrite, kept for compatibility)
+class CSVStorage:
+    name = "csv"
+
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self.lock = FileLock(csv_path)
+
+    def transaction(self, write=False):
+        """Serialise read-modify-write cycles across processes"""
+        return self.lock
+
+    def exists(self):
+        return os.path.exists(self.csv_path)
+
+    def load(self):
+        if not self.exists():
+            return empty_frame()
+        return read_csv_file(self.csv_path)
+
+    def replace(self, df):
+        with self.lock:
+            write_csv_atomic(df, self.csv_path)
+
+    def count(self):
+        return len(self.load())
+
+    def get(self, record_id):
+        df = self.load()
+        positions = id_positions(df, [record_id])
+        return None if positions[0] < 0 else frame_records(df.iloc[positions])[0]
+
+    def get_many(self, record_ids):
+        df = self.load()
+        return df[df['ID'].isin(record_ids)]
+
+    def signature(self):
+        if not self.exists():
+            return None
+        stat = os.stat(self.csv_path)
+        return (self.name, stat.st_size, stat.st_mtime_ns)
+
+    def insert(self, record):
+        with self.lock:
+            df = to_plain(self.load())
+            record = dict(record)
+            record["ID"] = int(df['ID'].max()) + 1 if not df.empty else 1
+            df = pd.concat([df, pd.DataFrame([record], columns=COLUMNS)], ignore_index=True)
+            self.replace(df)
+            return record["ID"]
+
+    def update(self, record_id, changes):
+        return self.update_many(pd.DataFrame([{"ID": int(record_id), **changes}])) > 0
+
+    def delete(self, record_id):
+        with self.lock:
+            df = self.load()
+            mask = df['ID'] == record_id
+            if not mask.any():
+                return False
+            self.replace(df[~mask])
+            return True
+
+    def insert_many(self, df):
+        with self.lock:
+            current = to_plain(self.load())
+            start = int(current['ID'].max()) + 1 if not current.empty else 1
+            new = df.reindex(columns=COLUMNS)
+            new['ID'] = range(start, start + len(new))
+            self.replace(pd.concat([current, new], ignore_index=True))
+            return new['ID'].tolist()
+
+    def update_many(self, df):
+        with self.lock:
+            current = to_plain(self.load())
+            changes = pd.DataFrame(frame_records(df))
+            positions = id_positions(current, changes['ID'])
+            found = positions >= 0
+            positions, changes = positions[found], changes[found]
+            for col in changes.columns.drop('ID'):
+                # Object columns accept any incoming value; typing is restored on the next load
+                values = current[col].to_numpy(dtype=object, copy=True)
+                values[positions] = changes[col].to_numpy(dtype=object)
+                current[col] = values
+            if found.any():
+                self.replace(current)
+            return int(found.sum())
+
+    def delete_many(self, record_ids):
+        with self.lock:
+            df = self.load()
+            mask = df['ID'].isin(record_ids)
+            self.replace(df[~mask])
+            return int(mask.sum())
+
+    def search(self, column, text):
+        df = self.load()
+        return df[df[column].astype(str).str.contains(text, case=False, regex=False)]
+
+    def date_range(self, start_date, end_date):
+        df = self.load()
+        dates = date_text(df['Date'])
+        return df[(dates >= start_date) & (dates <= end_date)]
+
+    def export_csv(self, path):
+        self.load().to_csv(path, index=False)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+# Engine 2: SQLite with a B-tree primary key on ID
+class SQLiteStorage:
+    """Keeps records in SQLite so single-record operations are O(log N).
+
+    The CSV is only read once, to seed a brand-new database, and is
+    otherwise an export format (see export_csv). Every write runs in a
+    BEGIN IMMEDIATE transaction, so concurrent processes queue for the
+    write lock instead of overwriting each other, and each transaction
+    bumps a version counter other processes use to detect changes. The
+    counter restarts with every new database, so a random generation id,
+    stored when the database is created, tells one database from another.
+    """
+    name = "sqlite"
+
+    def __init__(self, db_path, seed_csv=None):
+        self.db_path = db_path
+        self._depth = 0
+        # Autocommit mode; transactions are managed explicitly in transaction()
+        self.conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        # WAL lets readers continue while a writer holds the lock
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('BEGIN IMMEDIATE')
+        is_new = self._create_schema()
+        self.conn.execute('COMMIT')
+        if is_new and seed_csv and os.path.exists(seed_csv):
+            self._insert_frame(read_csv_file(seed_csv))
+
+    @contextmanager
+    def transaction(self, write=False):
+        """Exclusive transaction; nested calls join the outer one.
+
+        The first write=True call in a transaction bumps the version counter.
+        """
+        if self._depth == 0:
+            self.conn.execute('BEGIN IMMEDIATE')
+            self._bumped = False
+        if write and not self._bumped:
+            self.conn.execute(f"UPDATE {META_TABLE} SET value = value + 1 WHERE key = 'version'")
+            self._bumped = True
+        self._depth += 1
+        try:
+            yield
+        except BaseException:
+            self._depth -= 1
+            if self._depth == 0:
+                self.conn.execute('ROLLBACK')
+            raise
+        self._depth -= 1
+        if self._depth == 0:
+            self.conn.execute('COMMIT')
+
+    def _create_schema(self):
+        columns = ', '.join(f'"{col}" {SQL_TYPES.get(col, "TEXT")}' for col in COLUMNS)
+        exists = self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (TABLE,)).fetchone()
+        self.conn.execute(f'CREATE TABLE IF NOT EXISTS {TABLE} ({columns})')
+        self.conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{TABLE}_date ON {TABLE} (Date)')
+        self.conn.execute(f'CREATE TABLE IF NOT EXISTS {META_TABLE} (key TEXT PRIMARY KEY, value INTEGER)')
+        self.conn.execute(f"INSERT OR IGNORE INTO {META_TABLE} VALUES ('version', 1)")
+        self.conn.execute(f"INSERT OR IGNORE INTO {META_TABLE} VALUES ('generation', ?)", (str(uuid.uuid4()),))
+        return exists is None
+
+    def _insert_frame(self, df):
+        placeholders = ', '.join('?' for _ in COLUMNS)
+        rows = (_row_values(rec, COLUMNS) for rec in df.to_dict('records'))
+        with self.transaction(write=True):
+            self.conn.executemany(f'INSERT INTO {TABLE} VALUES ({placeholders})', rows)
+
+    def _read(self, where="", params=()):
+        return pd.read_sql_query(f'SELECT * FROM {TABLE} {where} ORDER BY ID',
+                                 self.conn, params=params, dtype={'Phone': str})
+
+    def _query(self, where="", params=()):
+        df = self._read(where, params)
+        return apply_schema(df) if not df.empty else empty_frame()
+
+    def exists(self):
+        return self.conn.execute(f'SELECT 1 FROM {TABLE} LIMIT 1').fetchone() is not None
+
+    def load(self):
+        return self._query()
+
+    def replace(self, df):
+        with self.transaction(write=True):
+            self.conn.execute(f'DELETE FROM {TABLE}')
+            self._insert_frame(df)
+
+    def count(self):
+        return self.conn.execute(f'SELECT COUNT(*) FROM {TABLE}').fetchone()[0]
+
+    def get(self, record_id):
+        cursor = self.conn.execute(f'SELECT * FROM {TABLE} WHERE ID = ?', (int(record_id),))
+        row = cursor.fetchone()
+        return None if row is None else dict(zip(COLUMNS, row))
+
+    def get_many(self, record_ids):
+        record_ids = [int(i) for i in record_ids]
+        if not record_ids:
+            return empty_frame()
+        low, high = min(record_ids), max(record_ids)
+        if high - low < 4 * len(record_ids):
+            # Dense ID sets (result pages, bulk batches) are one primary-key range scan
+            df = self._read('WHERE ID BETWEEN ? AND ?', (low, high))
+            df = df[df['ID'].isin(record_ids)]
+        else:
+            # Stay under SQLite's bound-parameter limit
+            chunks = [record_ids[i:i + 900] for i in range(0, len(record_ids), 900)]
+            df = pd.concat([self._read(f'WHERE ID IN ({", ".join("?" for _ in chunk)})', chunk)
+                            for chunk in chunks], ignore_index=True)
+        return apply_schema(df.reset_index(drop=True)) if not df.empty else empty_frame()
+
+    def signature(self):
+        # Generation and write version identify the data in one primary-key lookup, without scanning it
+        meta = dict(self.conn.execute(f"SELECT key, value FROM {META_TABLE} WHERE key IN ('generation', 'version')"))
+        return (self.name, meta['generation'], meta['version'])
+
+    def insert(self, record):
+        columns = [col for col in COLUMNS if col != "ID"]
+        placeholders = ', '.join('?' for _ in columns)
+        quoted = ', '.join(f'"{col}"' for col in columns)
+        with self.transaction(write=True):
+            # ID is the rowid alias, so SQLite assigns max(ID) + 1 atomically
+            cursor = self.conn.execute(f'INSERT INTO {TABLE} ({quoted}) VALUES ({placeholders})',
+                                       _row_values(record, columns))
+        return cursor.lastrowid
+
+    def update(self, record_id, changes):
+        if not changes:
+            return self.get(record_id) is not None
+        assignments = ', '.join(f'"{col}" = ?' for col in changes)
+        with self.transaction(write=True):
+            cursor = self.conn.execute(f'UPDATE {TABLE} SET {assignments} WHERE ID = ?',
+                                       [*(plain_value(v) for v in changes.values()), int(record_id)])
+        return cursor.rowcount > 0
+
+    def delete(self, record_id):
+        with self.transaction(write=True):
+            cursor = self.conn.execute(f'DELETE FROM {TABLE} WHERE ID = ?', (int(record_id),))
+        return cursor.rowcount > 0
+
+    def insert_many(self, df):
+        with self.transaction(write=True):
+            # The write lock is held, so no other process can claim this ID block
+            start = (self.conn.execute(f'SELECT MAX(ID) FROM {TABLE}').fetchone()[0] or 0) + 1
+            new = df.reindex(columns=COLUMNS)
+            new['ID'] = range(start, start + len(new))
+            self._insert_frame(new)
+        return new['ID'].tolist()
+
+    def update_many(self, df):
+        columns = [col for col in df.columns if col != "ID"]
+        assignments = ', '.join(f'"{col}" = ?' for col in columns)
+        rows = ([*_row_values(rec, columns), int(rec["ID"])] for rec in frame_records(df))
+        with self.transaction(write=True):
+            cursor = self.conn.executemany(f'UPDATE {TABLE} SET {assignments} WHERE ID = ?', rows)
+        return cursor.rowcount
+
+    def delete_many(self, record_ids):
+        with self.transaction(write=True):
+            cursor = self.conn.executemany(f'DELETE FROM {TABLE} WHERE ID = ?',
+                                           ((int(i),) for i in record_ids))
+        return cursor.rowcount
+
+    def search(self, column, text):
+        # LIKE is case-insensitive for ASCII; escape wildcards in user text
+        pattern = '%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        return self._query(f'WHERE "{column}" LIKE ? ESCAPE \'\\\'', (pattern,))
+
+    def date_range(self, start_date, end_date):
+        return self._query('WHERE Date BETWEEN ? AND ?', (start_date, end_date))
+
+    def export_csv(self, path):
+        self.load().to_csv(path, index=False)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.conn.close()
+
+
+# Engine 3: CSV snapshot + append-only mutation journal
+class JournalStorage:
+    """Appends each create/update/delete as one JSON line to a journal file.
+
+    On open, the journal is replayed over the last CSV snapshot. Once the
+    journal holds `compact_threshold` entries it is folded into a new
+    snapshot (written atomically) and truncated. Journal entries are
+    idempotent, so a crash between writing the snapshot and truncating
+    the journal only replays changes that are already applied.
+
+    Several processes may share the files: every operation takes a file
+    lock and first replays entries appended by others since its last look
+    (or reloads entirely if another process compacted).
+    """
+    name = "journal"
+
+    def __init__(self, snapshot_path, journal_path, compact_threshold=1000, fsync=True):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self.lock = FileLock(journal_path)
+        with self.lock:
+            self._reload()
+
+    @contextmanager
+    def transaction(self, write=False):
+        """Hold the journal lock with the in-memory state caught up"""
+        with self.lock:
+            self._refresh()
+            yield
+
+    def _snapshot_signature(self):
+        if not os.path.exists(self.snapshot_path):
+            return None
+        stat = os.stat(self.snapshot_path)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _reload(self):
+        self.records = {}
+        self.next_id = 1
+        self.snapshot_sig = self._snapshot_signature()
+        if self.snapshot_sig is not None:
+            for rec in frame_records(read_csv_file(self.snapshot_path)):
+                self.records[rec["ID"]] = rec
+            self.next_id = max(self.records) + 1 if self.records else 1
+        self.offset = 0
+        self.pending = 0
+        self._replay()
+
+    def _refresh(self):
+        journal_size = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+        if self._snapshot_signature() != self.snapshot_sig or journal_size < self.offset:
+            # Another process compacted or replaced the data
+            self._reload()
+        elif journal_size > self.offset:
+            self._replay()
+
+    def _replay(self):
+        """Apply journal entries after self.offset (caller holds the lock)"""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'rb') as f:
+            f.seek(self.offset)
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-append; it was never acknowledged
+                    break
+                self._apply(entry)
+                self.pending += 1
+                self.offset += len(line)
+        if self.offset < os.path.getsize(self.journal_path):
+            # Drop the torn tail so new entries are not appended after it
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(self.offset)
+
+    def _apply(self, entry):
+        op = entry["op"]
+        if op == "put":
+            record = entry["record"]
+            self.records[record["ID"]] = record
+            self.next_id = max(self.next_id, record["ID"] + 1)
+        elif op == "update":
+            record = self.records.get(entry["id"])
+            if record is not None:
+                record.update(entry["changes"])
+        elif op == "delete":
+            self.records.pop(entry["id"], None)
+
+    def _append(self, entry):
+        self._append_many([entry])
+
+    def _append_many(self, entries):
+        # One write and one fsync for the whole batch (caller holds the lock)
+        data = ''.join(json.dumps(entry) + "\n" for entry in entries).encode('utf-8')
+        with open(self.journal_path, 'ab') as journal:
+            journal.write(data)
+            journal.flush()
+            if self.fsync:
+                os.fsync(journal.fileno())
+        for entry in entries:
+            self._apply(entry)
+        self.offset += len(data)
+        self.pending += len(entries)
+        if self.pending >= self.compact_threshold:
+            self.compact()
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot and start an empty journal"""
+        with self.transaction():
+            write_csv_atomic(self.load(), self.snapshot_path)
+            with open(self.journal_path, 'wb') as journal:
+                if self.fsync:
+                    os.fsync(journal.fileno())
+            self.snapshot_sig = self._snapshot_signature()
+            self.offset = 0
+            self.pending = 0
+
+    def exists(self):
+        with self.transaction():
+            return bool(self.records)
+
+    def load(self):
+        with self.transaction():
+            if not self.records:
+                return empty_frame()
+            return apply_schema(pd.DataFrame(list(self.records.values()), columns=COLUMNS))
+
+    def replace(self, df):
+        with self.transaction():
+            self.records = {rec["ID"]: rec for rec in frame_records(df[COLUMNS])}
+            self.next_id = max(self.records) + 1 if self.records else 1
+            self.compact()
+
+    def count(self):
+        with self.transaction():
+            return len(self.records)
+
+    def get(self, record_id):
+        with self.transaction():
+            record = self.records.get(int(record_id))
+            return None if record is None else dict(record)
+
+    def get_many(self, record_ids):
+        with self.transaction():
+            rows = [self.records[i] for i in record_ids if i in self.records]
+            return apply_schema(pd.DataFrame(rows, columns=COLUMNS)) if rows else empty_frame()
+
+    def signature(self):
+        with self.transaction():
+            return (self.name, self.snapshot_sig, self.offset)
+
+    def insert(self, record):
+        with self.transaction():
+            record = {col: plain_value(record.get(col)) for col in COLUMNS}
+            record["ID"] = self.next_id
+            self._append({"op": "put", "record": record})
+            return record["ID"]
+
+    def update(self, record_id, changes):
+        record_id = int(record_id)
+        with self.transaction():
+            if record_id not in self.records:
+                return False
+            changes = {col: plain_value(value) for col, value in changes.items()}
+            self._append({"op": "update", "id": record_id, "changes": changes})
+            return True
+
+    def delete(self, record_id):
+        record_id = int(record_id)
+        with self.transaction():
+            if record_id not in self.records:
+                return False
+            self._append({"op": "delete", "id": record_id})
+            return True
+
+    def insert_many(self, df):
+        with self.transaction():
+            new = df.reindex(columns=COLUMNS)
+            new['ID'] = range(self.next_id, self.next_id + len(new))
+            self._append_many([{"op": "put", "record": rec} for rec in frame_records(new)])
+            return new['ID'].tolist()
+
+    def update_many(self, df):
+        with self.transaction():
+            entries = []
+            for rec in frame_records(df):
+                record_id = int(rec.pop("ID"))
+                if record_id in self.records:
+                    entries.append({"op": "update", "id": record_id, "changes": rec})
+            if entries:
+                self._append_many(entries)
+            return len(entries)
+
+    def delete_many(self, record_ids):
+        with self.transaction():
+            entries = [{"op": "delete", "id": int(i)} for i in record_ids if int(i) in self.records]
+            if entries:
+                self._append_many(entries)
+            return len(entries)
+
+    def search(self, column, text):
+        df = self.load()
+        return df[df[column].astype(str).str.contains(text, case=False, regex=False)]
+
+    def date_range(self, start_date, end_date):
+        df = self.load()
+        dates = date_text(df['Date'])
+        return df[(dates >= start_date) & (dates <= end_date)]
+
+    def export_csv(self, path):
+        write_csv_atomic(self.load(), path)
+
+    def flush(self):
+        with self.transaction():
+            if self.pending:
+                self.compact()
+
+    def close(self):
+        self.flush()
+
+
+# Secondary-index layer that can sit on top of any engine
+class IndexedStorage:
+    """Answers text and date-range searches from SearchIndex instead of a full scan.
+
+    The index is built on first search (or loaded from `index_path` when its
+    saved signature still matches the engine) and maintained incrementally by
+    insert/update/delete. If the engine signature moves on without us (another
+    process wrote), the index is rebuilt. All other calls go straight to the
+    wrapped engine.
+    """
+
+    def __init__(self, engine, index_path=None):
+        self.engine = engine
+        self.name = engine.name
+        self.index_path = index_path
+        self._index = None
+        self._seen = None
+        self._last = None
+
+    def __getattr__(self, attr):
+        return getattr(self.engine, attr)
+
+    @property
+    def index(self):
+        with self.engine.transaction():
+            signature = self.engine.signature()
+            if self._index is not None and signature != self._seen:
+                self._index = None
+            if self._index is None:
+                if self.index_path:
+                    self._index = SearchIndex.load(self.index_path, signature)
+                if self._index is None:
+                    self._index = SearchIndex.build(self.engine.load())
+                self._seen = signature
+            return self._index
+
+    @contextmanager
+    def _maintain(self):
+        """Run a write with the engine locked and keep the index in step with it"""
+        with self.engine.transaction():
+            stale = self._index is not None and self.engine.signature() != self._seen
+            if stale:
+                self._index = None
+            yield self._index
+            if self._index is not None:
+                self._seen = self.engine.signature()
+
+    def insert(self, record):
+        with self._maintain() as index:
+            record_id = self.engine.insert(record)
+            if index is not None:
+                index.add({**record, "ID": record_id})
+        return record_id
+
+    def update(self, record_id, changes):
+        with self._maintain() as index:
+            old = self.engine.get(record_id) if index is not None else None
+            updated = self.engine.update(record_id, changes)
+            if updated and old is not None:
+                index.remove(old)
+                index.add({**old, **changes})
+        return updated
+
+    def delete(self, record_id):
+        with self._maintain() as index:
+            old = self.engine.get(record_id) if index is not None else None
+            deleted = self.engine.delete(record_id)
+            if deleted and old is not None:
+                index.remove(old)
+        return deleted
+
+    def insert_many(self, df):
+        with self._maintain() as index:
+            ids = self.engine.insert_many(df)
+            if index is not None:
+                for rec, record_id in zip(frame_records(df.reindex(columns=COLUMNS)), ids):
+                    index.add({**rec, "ID": record_id})
+        return ids
+
+    def update_many(self, df):
+        with self._maintain() as index:
+            old = self.engine.get_many(df['ID'].tolist()) if index is not None else None
+            updated = self.engine.update_many(df)
+            if old is not None:
+                changes = {rec["ID"]: rec for rec in frame_records(df)}
+                for rec in frame_records(old):
+                    index.remove(rec)
+                    index.add({**rec, **changes[rec["ID"]]})
+        return updated
+
+    def delete_many(self, record_ids):
+        with self._maintain() as index:
+            old = self.engine.get_many(record_ids) if index is not None else None
+            deleted = self.engine.delete_many(record_ids)
+            if old is not None:
+                for rec in frame_records(old):
+                    index.remove(rec)
+        return deleted
+
+    def replace(self, df):
+        self.engine.replace(df)
+        self._index = None
+
+    def search(self, column, text, limit=None, offset=0):
+        return self.select([(column, text)], limit=limit, offset=offset)
+
+    def date_range(self, start_date, end_date, limit=None, offset=0):
+        return self.select(dates=(start_date, end_date), limit=limit, offset=offset)
+
+    def select(self, text_filters=(), dates=None, limit=None, offset=0):
+        """Records matching every text filter and the date range (all records without filters)"""
+        text_filters, dates = tuple(text_filters), dates and tuple(dates)
+        with self.engine.transaction():
+            ids = self._matches(("select", text_filters, dates),
+                                lambda index: index.select(text_filters, dates))
+            return self._fetch(ids, limit, offset)
+
+    def _matches(self, query, find):
+        # Paging repeats the same query; reuse its ID list while the data is unchanged
+        index = self.index
+        if self._last is None or self._last[0] != (query, self._seen):
+            self._last = ((query, self._seen), find(index))
+        return self._last[1]
+
+    def _fetch(self, ids, limit, offset):
+        # Slice the sorted ID list first so only the requested page is read from the engine
+        ids = ids[offset:None if limit is None else offset + limit]
+        return self.engine.get_many(ids).sort_values('ID', ignore_index=True)
+
+    def close(self):
+        with self.engine.transaction():
+            self.engine.flush()
+            if self._index is not None and self.index_path and self.engine.signature() == self._seen:
+                self._index.save(self.index_path, self._seen)
+        self.engine.close()
+
+
+def open_storage(backend, csv_path, db_path, journal_path=None, index_path=None):
+    if backend == "csv":
+        engine = CSVStorage(csv_path)
+    elif backend == "sqlite":
+        engine = SQLiteStorage(db_path, seed_csv=csv_path)
+    elif backend == "journal":
+        engine = JournalStorage(csv_path, journal_path or os.path.splitext(csv_path)[0] + ".journal")
+    else:
+        raise ValueError(f"Unknown storage backend: {backend}")
+    return IndexedStorage(engine, index_path)
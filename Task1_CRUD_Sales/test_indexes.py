@@ -0,0 +1,29 @@
+import pandas as pd
+from indexes import SearchIndex
+from schema import apply_schema
+
+
+def frame_with_missing_date():
+    return apply_schema(pd.DataFrame({
+        "ID": [1, 2, 3],
+        "Date": ["2024-01-02", None, "2024-01-01"],
+        "CustomerName": ["Asha", "Ravi", "Meera"],
+        "Product": ["Pen", "Pen", "Book"],
+        "Category": ["Stationery", "Stationery", "Books"],
+    }))
+
+
+def test_build_with_missing_date():
+    df = frame_with_missing_date()
+    assert df["Date"].isna().sum() == 1
+    index = SearchIndex.build(df)
+    assert index.date_range("0000-01-01", "9999-12-31") == [1, 3]
+    assert index.search("Product", "pen") == [1, 2]
+
+
+def test_missing_date_keys_match_incremental_updates():
+    df = frame_with_missing_date()
+    index = SearchIndex.build(df)
+    index.remove(df.iloc[1].to_dict())
+    index.add({**df.iloc[1].to_dict(), "ID": 4})
+    assert index.date.keys == [("", 4), ("2024-01-01", 3), ("2024-01-02", 1)]
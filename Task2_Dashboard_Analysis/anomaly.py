@@ -0,0 +1,142 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# Series watched for anomalies: the whole business, then each product line and country
+WATCHED = [None, 'PRODUCTLINE', 'COUNTRY']
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def month_of(dates):
+    """Months since January 1970, for a datetime Series"""
+    return dates.dt.year.to_numpy(dtype=np.int64) * 12 + dates.dt.month.to_numpy(dtype=np.int64) - 1 - 1970 * 12
+
+
+def month_label(month):
+    return f"{MONTH_NAMES[month % 12]}-{1970 + month // 12}"
+
+
+def ewma_update(state, prefix, x, alpha):
+    """Fold x into an exponentially weighted mean and variance kept in state[prefix + 'mean'/'var']"""
+    diff = x - state[prefix + 'mean']
+    step = alpha * diff
+    state[prefix + 'mean'] += step
+    state[prefix + 'var'] = (1 - alpha) * (state[prefix + 'var'] + diff * step)
+
+
+def zscore(state, prefix, x):
+    sd = math.sqrt(state[prefix + 'var'])
+    return (x - state[prefix + 'mean']) / sd if sd > 0 else 0.0
+
+
+class AnomalyMonitor:
+    """Monthly sales and margin baselines kept as streaming statistics, with the alerts they raise.
+
+    Every watched series (all orders, each product line, each country) keeps
+    an EWMA mean and variance of its monthly sales and profit margin. Orders
+    are added to the open month; when orders for a later month arrive the
+    open month is closed: it is scored against the baselines, then folded
+    into them. Nothing is rescanned, so an update costs the size of the new
+    orders plus one step per series, however much history is behind it.
+    The months are assumed to arrive in order; orders for a month that is
+    already closed still reach the charts, but not the baselines.
+    """
+
+    def __init__(self, alpha=0.3, threshold=2.5, min_months=6, drop=0.5, margin_points=5.0):
+        self.alpha = alpha                  # weight of the newest month in the baselines
+        self.threshold = threshold          # |z| that counts as an anomaly
+        self.min_months = min_months        # history a series needs before it is scored
+        self.drop = drop                    # fraction below baseline that makes a deviation a sudden drop
+        self.margin_points = margin_points  # margin fall (percentage points) that makes a collapse
+        self.series = {}                    # (dimension, label) -> baseline state
+        self.month = None                   # the open (still filling) month
+        self.open = {}                      # (dimension, label) -> [sales, profit] so far this month
+        self.alerts = []                    # raised when the latest month closed
+
+    @classmethod
+    def build(cls, df, **options):
+        monitor = cls(**options)
+        monitor.update(df)
+        return monitor
+
+    def update(self, orders):
+        """Fold new enriched orders in; returns True when a month closed (and the alerts changed)"""
+        if orders.empty:
+            return False
+        closed = False
+        for month, sums in sorted(self._monthly_sums(orders).items()):
+            if self.month is not None and month < self.month:
+                continue
+            if self.month is not None and month > self.month:
+                # Months without any orders are closed too, as zero sales
+                for finished in range(self.month, month):
+                    self._close(finished)
+                closed = True
+            self.month = month
+            for key, sales, profit in sums:
+                open_sums = self.open.setdefault(key, [0.0, 0.0])
+                open_sums[0] += sales
+                open_sums[1] += profit
+        return closed
+
+    @staticmethod
+    def _monthly_sums(orders):
+        """{month: [((dimension, label), sales, profit), ...]} for every watched series, in one pass.
+
+        One groupby per dimension over just the month, label and the two
+        measures, rather than slicing the orders month by month.
+        """
+        frame = pd.DataFrame({'month': month_of(orders['ORDERDATE']),
+                              'SALES': orders['SALES'].to_numpy(dtype=float),
+                              'PROFIT': orders['PROFIT'].to_numpy(dtype=float)})
+        by_month = {}
+        for dim in WATCHED:
+            if dim is None:
+                sums = frame.groupby('month', sort=False)[['SALES', 'PROFIT']].sum()
+                keys = ((month, (None, 'All orders')) for month in sums.index)
+            else:
+                sums = (frame.assign(label=orders[dim].to_numpy())
+                        .groupby(['month', 'label'], sort=False, observed=True)[['SALES', 'PROFIT']].sum())
+                keys = ((month, (dim, label)) for month, label in sums.index)
+            for (month, key), sales, profit in zip(keys, sums['SALES'].tolist(), sums['PROFIT'].tolist()):
+                by_month.setdefault(int(month), []).append((key, sales, profit))
+        return by_month
+
+    def _close(self, month):
+        alerts = []
+        for key in set(self.series) | set(self.open):
+            sales, profit = self.open.get(key, (0.0, 0.0))
+            state = self.series.setdefault(key, {'months': 0, 'sales_mean': sales, 'sales_var': 0.0,
+                                                 'margin_mean': None, 'margin_var': 0.0})
+            margin = profit / sales * 100 if sales > 0 else None
+            if state['months'] >= self.min_months:
+                alerts.extend(self._score(key, month, state, sales, margin))
+            ewma_update(state, 'sales_', sales, self.alpha)
+            if margin is not None:
+                if state['margin_mean'] is None:
+                    state['margin_mean'] = margin
+                ewma_update(state, 'margin_', margin, self.alpha)
+            state['months'] += 1
+        self.open = {}
+        # Strongest deviations first
+        self.alerts = sorted(alerts, key=lambda alert: -abs(alert['z']))
+
+    def _score(self, key, month, state, sales, margin):
+        dim, label = key
+        name = f"{label} sales" if dim else "Sales"
+        when = month_label(month)
+        z = zscore(state, 'sales_', sales)
+        if z <= -self.threshold and sales < (1 - self.drop) * state['sales_mean']:
+            yield {'type': 'warning', 'icon': 'fa-arrow-down', 'z': z,
+                   'message': f"{name} dropped {1 - sales / state['sales_mean']:.0%} below baseline in {when}"}
+        elif abs(z) >= self.threshold:
+            yield {'type': 'success' if z > 0 else 'warning',
+                   'icon': 'fa-chart-line' if z > 0 else 'fa-exclamation-triangle', 'z': z,
+                   'message': f"{name} {abs(z):.1f}σ {'above' if z > 0 else 'below'} baseline in {when}"}
+        if margin is not None and state['margin_mean'] is not None:
+            z = zscore(state, 'margin_', margin)
+            if z <= -self.threshold and state['margin_mean'] - margin >= self.margin_points:
+                yield {'type': 'warning', 'icon': 'fa-exclamation-triangle', 'z': z,
+                       'message': f"{label or 'Overall'} margin fell to {margin:.1f}% "
+                                  f"(baseline {state['margin_mean']:.1f}%) in {when}"}
@@ -0,0 +1,71 @@
+"""Inference latency of the sales model: one order at a time vs. one batch.
+
+    python bench_predict.py --rows 10000
+
+Times predict() (what the prediction panel calls, forest spread included),
+a loop of single-row predict_batch() calls, and one predict_batch() over
+all rows, which is what /api/predict runs for a what-if sweep.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from predictor import SalesPredictor
+
+
+def sweep(predictor, rows, seed=0):
+    """What-if rows: every known country x product at random quantities and prices"""
+    rng = np.random.default_rng(seed)
+    countries = list(predictor.codes['country'])
+    products = list(predictor.codes['product'])
+    msrp = rng.uniform(30, 220, rows)
+    return pd.DataFrame({'qty': rng.integers(10, 100, rows),
+                         'price': msrp * rng.uniform(0.6, 1.1, rows),
+                         'msrp': msrp,
+                         'country': rng.choice(countries, rows),
+                         'product': rng.choice(products, rows)})
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return np.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single-row and batch sales predictions")
+    parser.add_argument('--rows', type=int, default=10000, help="rows in the batch")
+    parser.add_argument('--single', type=int, default=200, help="single-row calls to time")
+    args = parser.parse_args()
+
+    predictor = SalesPredictor()
+    started = time.perf_counter()
+    predictor.load()
+    print(f"load (or first-run training): {time.perf_counter() - started:.2f}s")
+    rows = sweep(predictor, args.rows)
+    records = rows.head(args.single).to_dict('records')
+
+    started = time.perf_counter()
+    for r in records:
+        predictor.predict(r['qty'], r['price'], r['msrp'], r['country'], r['product'])
+    panel = (time.perf_counter() - started) / len(records)
+    started = time.perf_counter()
+    for r in records:
+        predictor.predict_batch([r])
+    single = (time.perf_counter() - started) / len(records)
+    batch = timed(lambda: predictor.predict_batch(rows), repeat=5)
+
+    print(f"{'mode':<28}{'per call ms':>12}{'per row us':>12}")
+    print(f"{'panel predict() + range':<28}{panel * 1e3:>12.2f}{panel * 1e6:>12.0f}")
+    print(f"{'predict_batch(), 1 row':<28}{single * 1e3:>12.2f}{single * 1e6:>12.0f}")
+    print(f"{f'predict_batch(), {args.rows} rows':<28}{batch * 1e3:>12.2f}{batch / args.rows * 1e6:>12.1f}")
+    print(f"batch speed-up per row: {single / (batch / args.rows):.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache shared by all callbacks and sessions.
+
+    Keys should include the data version they were computed from, so entries
+    for stale data are never returned and simply age out.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+        # Computed outside the lock so a slow miss does not block other lookups
+        value = compute()
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class SharedCache:
+    """Cache shared by every worker process, kept as one pickle file per key in `directory`.
+
+    Same interface as LRUCache. Keys are hashed from their repr, so they must
+    be built from plain values (strings, numbers, None, tuples) that print the
+    same in every process. Files are written to a temporary name and renamed
+    into place, so a reader sees a whole entry or none. A hit touches the
+    file, and once more than `maxsize` files exist the least recently used
+    ones are removed.
+    """
+
+    def __init__(self, directory, maxsize=256):
+        self.directory = directory
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(repr(key).encode()).hexdigest() + '.pkl')
+
+    def get_or_compute(self, key, compute):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)
+            self.hits += 1
+            return value
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1  # missing, or evicted by another worker while being read
+        value = compute()
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._evict()
+        return value
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.pkl'):
+                try:
+                    entries.append((os.path.getmtime(os.path.join(self.directory, name)), name))
+                except OSError:
+                    pass  # removed by another worker
+        for _, name in sorted(entries)[:max(0, len(entries) - self.maxsize)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.pkl'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def __len__(self):
+        return sum(name.endswith('.pkl') for name in os.listdir(self.directory))
+
+
+class ResultStore:
+    """Server-side home for large callback results; browsers only hold a handle.
+
+    A handle is the small, JSON-safe key the result was computed from, so a
+    result evicted from the cache (or requested by another worker) is simply
+    rebuilt from its handle.
+    """
+
+    def __init__(self, compute, maxsize=8):
+        self.compute = compute
+        self.cache = LRUCache(maxsize)
+
+    def handle(self, key):
+        return {'key': list(key)}
+
+    def get(self, handle):
+        # JSON turns the key's tuples into lists; restore them so the key is hashable
+        key = tuple(tuple(part) if isinstance(part, list) else part for part in handle['key'])
+        return self.cache.get_or_compute(key, lambda: self.compute(key))
+
+
+def normalize_filters(start_date, end_date, products, countries, segments, universe):
+    """Canonical, hashable form of a filter state.
+
+    Dates become 'YYYY-MM-DD' (the date filter only applies when both ends are
+    set), lists become sorted tuples, and an empty list or one that selects
+    every known value becomes None, since all of those mean "no filter".
+    `universe` maps each filter position to the set of values it can take.
+    """
+    if start_date and end_date:
+        dates = (pd.Timestamp(start_date).strftime('%Y-%m-%d'), pd.Timestamp(end_date).strftime('%Y-%m-%d'))
+    else:
+        dates = (None, None)
+    chosen = []
+    for values, known in zip((products, countries, segments), universe):
+        values = tuple(sorted(set(values or ()), key=str))
+        chosen.append(None if not values or known <= set(values) else values)
+    return dates + tuple(chosen)
@@ -0,0 +1,101 @@
+import json
+import os
+import pickle
+import shutil
+
+import numpy as np
+import pandas as pd
+
+META_FILE = 'meta.json'
+
+
+def save_frame(df, directory):
+    """Write a DataFrame as one .npy file per column plus a small JSON schema.
+
+    Text columns are dictionary-encoded (int32 codes + a category list) and
+    datetimes are stored as int64 ticks, so every column is a flat NumPy
+    array that can later be memory-mapped. The directory is written beside
+    the target and swapped in, so readers never see a half-written store.
+    """
+    tmp_dir = f"{directory}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    columns = []
+    for i, name in enumerate(df.columns):
+        values = df[name]
+        entry = {'name': name, 'file': f"{i}.npy"}
+        if isinstance(values.dtype, pd.CategoricalDtype) or not (
+                pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values)):
+            categorical = values.astype('category')
+            entry['kind'] = 'category'
+            entry['categories'] = [c.item() if hasattr(c, 'item') else c for c in categorical.cat.categories]
+            entry['ordered'] = bool(categorical.cat.ordered)
+            array = categorical.cat.codes.to_numpy(dtype=np.int32)
+        elif pd.api.types.is_datetime64_any_dtype(values):
+            entry['kind'] = 'datetime'
+            entry['dtype'] = str(values.dtype)
+            array = values.to_numpy().view(np.int64)
+        else:
+            entry['kind'] = 'numeric'
+            # Nullable integers with gaps become floats; everything else keeps its NumPy dtype
+            array = values.to_numpy(dtype=float if values.isna().any() else None)
+            if array.dtype == object:
+                array = values.to_numpy(dtype=float)
+        np.save(os.path.join(tmp_dir, entry['file']), np.ascontiguousarray(array))
+        columns.append(entry)
+    with open(os.path.join(tmp_dir, META_FILE), 'w') as f:
+        json.dump({'rows': len(df), 'columns': columns}, f)
+    if os.path.exists(directory):
+        old_dir = f"{directory}.{os.getpid()}.old"
+        os.replace(directory, old_dir)
+        os.replace(tmp_dir, directory)
+        shutil.rmtree(old_dir, ignore_errors=True)
+    else:
+        os.replace(tmp_dir, directory)
+
+
+def load_frame(directory, mmap=True):
+    """Read a frame written by save_frame.
+
+    With mmap=True the columns are read-only views of memory-mapped files:
+    nothing is parsed or copied, and every process mapping the same store
+    shares one copy of the data through the OS page cache.
+    """
+    with open(os.path.join(directory, META_FILE)) as f:
+        meta = json.load(f)
+    data = {}
+    for entry in meta['columns']:
+        array = np.load(os.path.join(directory, entry['file']), mmap_mode='r' if mmap else None)
+        if entry['kind'] == 'category':
+            dtype = pd.CategoricalDtype(entry['categories'], ordered=entry['ordered'])
+            data[entry['name']] = pd.Categorical.from_codes(array, dtype=dtype, validate=False)
+        elif entry['kind'] == 'datetime':
+            data[entry['name']] = array.view(entry['dtype'])
+        else:
+            data[entry['name']] = array
+    return pd.DataFrame(data, copy=False)
+
+
+def cached(directory, name, compute):
+    """Something derived from the store in `directory`, pickled beside it the first time it is computed.
+
+    A store never changes once written, so neither do values derived from
+    it. With no directory (data not loaded from a store) this is compute().
+    """
+    if directory is None:
+        return compute()
+    path = os.path.join(directory, f"{name}.pkl")
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+    value = compute()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # a read-only store still works, just without the shortcut
+    return value
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+# Every KPI card and chart is a sum of these measures over these dimensions
+DIMENSIONS = ["PRODUCTLINE", "COUNTRY", "CUSTOMER_SEGMENT"]
+MEASURES = ["SALES", "PROFIT", "QUANTITYORDERED", "FULFILLED"]
+COUNT = "ORDERS"
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+          "August", "September", "October", "November", "December"]
+
+
+def to_day(dates):
+    """Dates as int days since 1970-01-01 (the cube's time key)"""
+    return np.asarray(pd.to_datetime(dates).values.astype("datetime64[D]").astype(np.int64))
+
+
+def day_of(value):
+    """to_day for a single date (no array round trip, for per-query bounds)"""
+    return int(pd.Timestamp(value).to_datetime64().astype("datetime64[D]").astype(np.int64))
+
+
+def from_day(days):
+    return pd.to_datetime(np.asarray(days, dtype=np.int64).astype("datetime64[D]"))
+
+
+class SalesCube:
+    """Pre-aggregated sales, one cell per (day, product line, country, segment).
+
+    Cells are kept sorted by day, so a date range is two binary searches, and
+    the dimension filters are lookups into per-value masks. Query cost depends
+    on the number of cells, not the number of orders behind them.
+    """
+
+    def __init__(self):
+        self.labels = {dim: [] for dim in DIMENSIONS}   # code -> value
+        self.codes = {dim: {} for dim in DIMENSIONS}    # value -> code
+        self.day = np.empty(0, dtype=np.int64)
+        self.keys = {dim: np.empty(0, dtype=np.int32) for dim in DIMENSIONS}
+        self.values = {m: np.empty(0) for m in MEASURES + [COUNT]}
+        # Orders folded in so far, for caches keyed on the data. A count rather than an
+        # update counter, so worker processes that have seen the same orders agree on it.
+        self.version = 0
+
+    @classmethod
+    def build(cls, df):
+        cube = cls()
+        cube.add(df)
+        return cube
+
+    def __len__(self):
+        return len(self.day)
+
+    # Building and incremental updates
+    def _encode(self, dim, values):
+        codes, labels = self.codes[dim], self.labels[dim]
+        # Missing values (e.g. no segment) get a code of their own
+        values = pd.Series(values, dtype=object).where(pd.notna(values), None)
+        inverse, uniques = pd.factorize(values, use_na_sentinel=False)
+        for value in uniques:
+            if value not in codes:
+                codes[value] = len(labels)
+                labels.append(value)
+        mapping = np.array([codes[value] for value in uniques], dtype=np.int32)
+        return mapping[inverse]
+
+    def _aggregate(self, df):
+        cells = pd.DataFrame({"day": to_day(df["ORDERDATE"])})
+        for dim in DIMENSIONS:
+            cells[dim] = self._encode(dim, df[dim].to_numpy())
+        for m in MEASURES:
+            cells[m] = df[m].to_numpy(dtype=float)
+        cells[COUNT] = 1.0
+        return cells.groupby(["day"] + DIMENSIONS, sort=True).sum().reset_index()
+
+    def _cells(self):
+        cells = pd.DataFrame({"day": self.day, **self.keys})
+        for m, values in self.values.items():
+            cells[m] = values
+        return cells
+
+    def _store(self, cells):
+        self.day = cells["day"].to_numpy(dtype=np.int64)
+        self.keys = {dim: cells[dim].to_numpy(dtype=np.int32) for dim in DIMENSIONS}
+        self.values = {m: cells[m].to_numpy(dtype=float) for m in MEASURES + [COUNT]}
+
+    def add(self, df):
+        """Fold new orders into the cube; cost is proportional to the delta plus the cells touched"""
+        if df.empty:
+            return
+        self.version += len(df)
+        delta = self._aggregate(df)
+        if not len(self) or delta["day"].iloc[0] > self.day[-1]:
+            # Orders arriving in date order only ever append cells
+            cells = pd.concat([self._cells(), delta], ignore_index=True)
+        else:
+            cells = (pd.concat([self._cells(), delta], ignore_index=True)
+                     .groupby(["day"] + DIMENSIONS, sort=True).sum().reset_index())
+        self._store(cells)
+
+    # Queries
+    def select(self, start_date=None, end_date=None, products=None, countries=None, segments=None):
+        """Positions of the cells matching a filter state (empty lists mean no filter)"""
+        lo, hi = 0, len(self)
+        if start_date and end_date:
+            lo = np.searchsorted(self.day, day_of(start_date), side="left")
+            hi = np.searchsorted(self.day, day_of(end_date), side="right")
+        selected = np.arange(lo, hi)
+        for dim, chosen in zip(DIMENSIONS, (products, countries, segments)):
+            if chosen:
+                allowed = np.zeros(len(self.labels[dim]), dtype=bool)
+                allowed[[self.codes[dim][v] for v in chosen if v in self.codes[dim]]] = True
+                selected = selected[allowed[self.keys[dim][selected]]]
+        return selected
+
+    def totals(self, selected):
+        return {m: float(values[selected].sum()) for m, values in self.values.items()}
+
+    def by(self, dim, selected):
+        """Measures per value of one dimension, for values with at least one order"""
+        codes = self.keys[dim][selected]
+        size = len(self.labels[dim])
+        out = pd.DataFrame({m: np.bincount(codes, weights=values[selected], minlength=size)
+                            for m, values in self.values.items()})
+        out.insert(0, dim, self.labels[dim])
+        return out[out[COUNT] > 0].reset_index(drop=True)
+
+    def by_day(self, selected):
+        """Measures per calendar day, for days with at least one order"""
+        days = self.day[selected]
+        if not len(days):
+            return pd.DataFrame(columns=["day"] + MEASURES + [COUNT])
+        # Cells are sorted by day, so the selection is too
+        first = days[0]
+        offsets = days - first
+        out = pd.DataFrame({m: np.bincount(offsets, weights=values[selected])
+                            for m, values in self.values.items()})
+        out.insert(0, "day", np.arange(len(out)) + first)
+        return out[out[COUNT] > 0].reset_index(drop=True)
+
+    def weekday_month(self, selected, measure="SALES"):
+        """Weekday x month totals of one measure, with only the weekdays/months present"""
+        days = self.day[selected]
+        weekday = (days + 3) % 7  # 1970-01-01 was a Thursday
+        month = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64) % 12
+        grid = np.bincount(weekday * 12 + month, weights=self.values[measure][selected],
+                           minlength=7 * 12).reshape(7, 12)
+        rows, cols = np.unique(weekday), np.unique(month)
+        return pd.DataFrame(grid[np.ix_(rows, cols)],
+                            index=[WEEKDAYS[r] for r in rows], columns=[MONTHS[c] for c in cols])
@@ -1,62 +1,135 @@
 import dash
-from dash import dcc, html, Input, Output, State, dash_table, callback, ctx
+import flask
+from dash import dcc, html, Input, Output, State, Patch, dash_table, callback, ctx
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import joblib
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 import dash_bootstrap_components as dbc
-from dash_bootstrap_templates import ThemeChangerAIO, template_from_url
+from cube import DIMENSIONS, SalesCube
+from cache import LRUCache, ResultStore, SharedCache, normalize_filters
+from colstore import cached, load_frame
+from table import DEFAULT_SORT, OrderTable
+from rollups import LEVELS, build_rollups, period_axis
+from preprocess import enrich, prepare_orders, sample_orders
+from ingest import LiveIngest
+from predictor import SalesPredictor
+from kpi import PeriodTotals, growth_alerts
+from anomaly import AnomalyMonitor
+import argparse
+import json
+import os
+import threading
 import warnings
 warnings.filterwarnings('ignore')
 
-# Load data & model (with error handling)
+# Load data (with error handling)
+# The enriched orders live in a column store cached per source-file hash, so only the first start
+# parses the CSV; a worker started by serve.py is handed its parent's store instead
 try:
-    df = pd.read_csv('data/sales_data_sample.csv', encoding='latin1')
-    model = joblib.load('model/sales_model.pkl')
-    le_product = joblib.load('model/le_product.pkl')
-    le_country = joblib.load('model/le_country.pkl')
-except:
-    # Fallback sample data if files don't exist
-    np.random.seed(42)
-    dates = pd.date_range('2020-01-01', '2024-12-31', freq='D')
-    df = pd.DataFrame({
-        'ORDERNUMBER': range(1, 1001),
-        'ORDERDATE': np.random.choice(dates, 1000),
-        'COUNTRY': np.random.choice(['USA', 'UK', 'France', 'Germany', 'Japan', 'Australia'], 1000),
-        'PRODUCTLINE': np.random.choice(['Motorcycles', 'Classic Cars', 'Trucks', 'Vintage Cars', 'Planes', 'Ships'], 1000),
-        'QUANTITYORDERED': np.random.randint(10, 100, 1000),
-        'PRICEEACH': np.random.uniform(20, 200, 1000),
-        'MSRP': np.random.uniform(25, 250, 1000),
-        'SALES': np.random.uniform(1000, 50000, 1000)
-    })
+    dataset_dir = os.environ.get('SALES_SHARED_DATA') or prepare_orders('data/sales_data_sample.csv', 'data/.cache')
+    df = load_frame(dataset_dir)
+except (OSError, ValueError):
+    # Sample orders stand in if the CSV is missing
+    dataset_dir = None
+    df = enrich(sample_orders())
+
+# Sales model for the prediction panel and /api/predict; loaded (or trained) on the first prediction
+predictor = SalesPredictor()
+
+# Pre-aggregated cube (day x product line x country x segment) behind the KPI cards and charts
+cube = cached(dataset_dir, 'cube', lambda: SalesCube.build(df))
+
+# Pre-sorted row source for the server-side paged transaction table
+order_table = OrderTable(df, orders=cached(dataset_dir, 'table-orders', lambda: OrderTable(df).orders))
+# Monthly baselines per product line and country; live orders are folded into them as they arrive
+anomalies = cached(dataset_dir, 'anomalies', lambda: AnomalyMonitor.build(df))
+
+def filter_orders(start_date, end_date, products, countries, segments):
+    """Row mask over the table's orders for a filter state (only needed where individual orders are shown)"""
+    orders = order_table.frame
+    mask = np.ones(len(orders), dtype=bool)
+    if start_date and end_date:
+        mask &= ((orders['ORDERDATE'] >= pd.to_datetime(start_date)) &
+                 (orders['ORDERDATE'] <= pd.to_datetime(end_date))).to_numpy()
+    if products:
+        mask &= orders['PRODUCTLINE'].isin(products).to_numpy()
+    if countries:
+        mask &= orders['COUNTRY'].isin(countries).to_numpy()
+    if segments:
+        mask &= orders['CUSTOMER_SEGMENT'].isin(segments).to_numpy()
+    return mask
+
+# Filter results shared by every callback and every session, keyed on the normalized filter state
+result_cache = LRUCache(maxsize=64)
+# Raw order subsets stay on the server; the browser's filtered-data-store only gets a handle
+orders_store = ResultStore(lambda key: filter_orders(*key[1:]), maxsize=8)
+# Sorted/filtered table views of those subsets; any page is then a slice
+table_views = LRUCache(maxsize=8)
+# Finished chart figures; under serve.py one cache directory is shared by every worker process
+figure_cache = (SharedCache(os.environ['SALES_FIGURE_CACHE']) if os.environ.get('SALES_FIGURE_CACHE')
+                else LRUCache(maxsize=32))
+
+def filter_key(start_date, end_date, products, countries, segments):
+    universe = [set(cube.labels[dim]) for dim in DIMENSIONS]
+    # The cube version makes entries computed before new data arrived unreachable
+    return (cube.version,) + normalize_filters(start_date, end_date, products, countries, segments, universe)
+
+def select_cells(*filters):
+    key = filter_key(*filters)
+    return result_cache.get_or_compute(('cells',) + key, lambda: cube.select(*key[1:]))
+
+def filter_totals(*filters):
+    key = filter_key(*filters)
+    return result_cache.get_or_compute(('totals',) + key, lambda: cube.totals(select_cells(*filters)))
+
+def period_totals(start_date, end_date, products, countries, segments):
+    """Day-by-day running totals for a product/country/segment selection, over the whole data span.
+
+    The dates are left out of the key: any range, its previous period and the
+    year before are then read from the same prefix sums.
+    """
+    filters = (None, None, products, countries, segments)
+    return result_cache.get_or_compute(
+        ('period',) + filter_key(*filters),
+        lambda: PeriodTotals(cube.by_day(select_cells(*filters)), cube.day[0], cube.day[-1]))
 
-# Advanced data preprocessing
-df['ORDERDATE'] = pd.to_datetime(df['ORDERDATE'])
-df['Month'] = df['ORDERDATE'].dt.month
-df['Year'] = df['ORDERDATE'].dt.year
-df['Month-Year'] = df['ORDERDATE'].dt.strftime('%b-%Y')
-df['Quarter'] = df['ORDERDATE'].dt.quarter
-df['Quarter-Year'] = 'Q' + df['Quarter'].astype(str) + '-' + df['Year'].astype(str)
-df['Week'] = df['ORDERDATE'].dt.isocalendar().week
-df['Weekday'] = df['ORDERDATE'].dt.day_name()
-df['Month_Name'] = df['ORDERDATE'].dt.strftime('%B')
-
-# Advanced calculated metrics
-df['PROFIT'] = (df['PRICEEACH'] - df['MSRP'] * 0.6) * df['QUANTITYORDERED']
-df['PROFIT_MARGIN'] = (df['PROFIT'] / df['SALES']) * 100
-df['DISCOUNT'] = df['MSRP'] - df['PRICEEACH']
-df['DISCOUNT_RATE'] = (df['DISCOUNT'] / df['MSRP']) * 100
-df['REVENUE_PER_UNIT'] = df['SALES'] / df['QUANTITYORDERED']
-df['CUSTOMER_SEGMENT'] = pd.cut(df['SALES'], bins=[0, 1000, 5000, 20000, float('inf')], 
-                               labels=['Low Value', 'Medium Value', 'High Value', 'Premium'])
-
-# Performance metrics
-df_current = df[df['ORDERDATE'] >= (df['ORDERDATE'].max() - timedelta(days=30))]
-df_previous = df[(df['ORDERDATE'] >= (df['ORDERDATE'].max() - timedelta(days=60))) & 
-                 (df['ORDERDATE'] < (df['ORDERDATE'].max() - timedelta(days=30)))]
+def kpi_comparison(start_date, end_date, products, countries, segments):
+    return period_totals(None, None, products, countries, segments).compare(start_date, end_date)
+
+def product_movers(start_date, end_date, products, countries, segments):
+    """[(product line, KPI comparison)] for each product line in the selection"""
+    lines = products or [label for label in cube.labels['PRODUCTLINE'] if label is not None]
+    return [(line, kpi_comparison(start_date, end_date, [line], countries, segments)) for line in lines]
+
+def orders_handle(*filters):
+    return orders_store.handle(filter_key(*filters))
+
+# Live ingest: new orders are enriched on their own and folded into the cube and the
+# order table in place. `df` stays the dataset loaded at startup; it is not re-copied per delta.
+ingest_lock = threading.Lock()
+latest_dates = [df['ORDERDATE'].max().normalize()]  # every "latest day" sessions may be parked on
+
+def apply_new_orders(new_rows):
+    new_rows = enrich(new_rows)
+    with ingest_lock:
+        order_table.append(new_rows)
+        anomalies.update(new_rows)
+        latest_dates.append(max(latest_dates[-1], new_rows['ORDERDATE'].max().normalize()))
+        # Bumping the cube version last switches every cache over in one step
+        cube.add(new_rows)
+
+live_ingest = LiveIngest(apply_new_orders)
+# A JSON list set by serve.py, so every worker tails the same sources ('orders.db:table' contains ':')
+for source in json.loads(os.environ.get('SALES_LIVE_SOURCES') or '[]'):
+    live_ingest.add_source(source)
+
+def trend_rollups(*filters):
+    """Daily to yearly trend levels for a filter state, built once and shared by every time-filter choice"""
+    key = filter_key(*filters)
+    return result_cache.get_or_compute(
+        ('trend',) + key, lambda: build_rollups(cube.by_day(select_cells(*filters))))
 
 # Modern color scheme
 colors = {
@@ -82,6 +155,24 @@ app = dash.Dash(__name__,
                 ])
 
 app.title = "Enterprise Sales Analytics Suite"
+server = app.server  # WSGI entry point for serve.py / gunicorn
+
+@server.route('/api/predict', methods=['POST'])
+def predict_batch():
+    """Score many orders in one vectorized call, e.g. for what-if sweeps.
+
+    Body: a list of {"qty", "price", "msrp", "country", "product"} objects,
+    or one object holding a list per input. Returns {"predictions": [...]},
+    with null for rows whose country or product the model does not know.
+    """
+    rows = flask.request.get_json(silent=True)
+    if not rows:
+        return flask.jsonify(error="expected a JSON list of rows or an object of columns"), 400
+    try:
+        predictions = predictor.predict_batch(rows)
+    except (ValueError, TypeError) as e:
+        return flask.jsonify(error=str(e)), 400
+    return flask.jsonify(predictions=np.where(np.isnan(predictions), None, predictions).tolist())
 
 # Custom CSS - Fixed approach
 app.index_string = '''
@@ -239,9 +330,14 @@ app.index_string = '''
 '''
 
 # Advanced KPI card component
-def create_advanced_kpi_card(title, value, change, icon, color, prefix="", suffix=""):
-    change_color = colors['success'] if change >= 0 else colors['warning']
-    change_icon = "fa-arrow-up" if change >= 0 else "fa-arrow-down"
+def create_advanced_kpi_card(title, value, change, icon, color, prefix="", suffix="", basis="vs last period", yoy=None):
+    # No orders in the comparison window: say so rather than show a made-up change
+    if change is None:
+        change_color, change_icon, change_text = colors['text_secondary'], "fa-minus", "n/a"
+    else:
+        change_color = colors['success'] if change >= 0 else colors['warning']
+        change_icon = "fa-arrow-up" if change >= 0 else "fa-arrow-down"
+        change_text = f"{abs(change):.1f}%"
     
     return html.Div([
         html.Div([
@@ -254,53 +350,48 @@ def create_advanced_kpi_card(title, value, change, icon, color, prefix="", suffi
                         style={'color': colors['text'], 'margin': '8px 0', 'font-weight': '700'}),
                 html.Div([
                     html.I(className=f"fas {change_icon}", style={'color': change_color, 'margin-right': '8px'}),
-                    html.Span(f"{abs(change):.1f}%", style={'color': change_color, 'font-weight': '600'}),
-                    html.Span(" vs last period", style={'color': colors['text_secondary'], 'margin-left': '4px'})
-                ], className="trend-indicator")
+                    html.Span(change_text, style={'color': change_color, 'font-weight': '600'}),
+                    html.Span(f" {basis}", style={'color': colors['text_secondary'], 'margin-left': '4px'})
+                ], className="trend-indicator"),
+                html.Div(f"YoY: {yoy:+.1f}%" if yoy is not None else "YoY: n/a",
+                         style={'color': colors['text_secondary'], 'font-size': '12px', 'margin-top': '4px'})
             ], style={'flex': '1'})
         ], style={'display': 'flex', 'align-items': 'flex-start', 'gap': '16px'})
     ], className="kpi-card")
 
 # Alert system component
-def create_alert_system():
-    alerts = [
-        {"type": "warning", "message": "Sales in Q4 are 15% below target", "icon": "fa-exclamation-triangle"},
-        {"type": "success", "message": "Motorcycles segment exceeded expectations", "icon": "fa-check-circle"},
-        {"type": "info", "message": "New market opportunity identified in Asia", "icon": "fa-info-circle"}
+MAX_ALERTS_SHOWN = 6
+
+def create_alert_system(alerts):
+    alert_colors = {'success': colors['success'], 'warning': colors['warning']}
+    items = [
+        html.Div([
+            html.I(className=f"fas {alert['icon']}",
+                   style={'margin-right': '12px', 'color': alert_colors.get(alert['type'], colors['primary'])}),
+            html.Span(alert['message'], style={'color': colors['text_secondary'], 'font-size': '14px'})
+        ], className="alert-card", style={'margin-bottom': '8px'}) for alert in alerts[:MAX_ALERTS_SHOWN]
     ]
-    
+    if len(alerts) > MAX_ALERTS_SHOWN:
+        items.append(html.P(f"+{len(alerts) - MAX_ALERTS_SHOWN} more",
+                            style={'color': colors['text_secondary'], 'font-size': '12px'}))
     return html.Div([
         html.H6("🚨 Business Alerts", style={'color': colors['text'], 'margin-bottom': '16px', 'font-weight': '600'}),
-        html.Div([
-            html.Div([
-                html.I(className=f"fas {alert['icon']}", style={'margin-right': '12px', 'color': colors['warning']}),
-                html.Span(alert['message'], style={'color': colors['text_secondary'], 'font-size': '14px'})
-            ], className="alert-card", style={'margin-bottom': '8px'}) for alert in alerts
-        ])
+        html.Div(items or [html.P("No notable changes in the selected period",
+                                  style={'color': colors['text_secondary'], 'font-size': '14px'})])
     ])
 
-# Real-time metrics simulator
+# Headline metrics for the whole dataset, with the same growth figures as the KPI cards
 def get_real_time_metrics():
-    total_sales = df['SALES'].sum()
-    total_orders = len(df)
-    avg_order_value = total_sales / total_orders
-    total_profit = df['PROFIT'].sum()
-    
-    # Simulate growth rates
-    sales_growth = np.random.uniform(5, 25)
-    orders_growth = np.random.uniform(-2, 15)
-    aov_growth = np.random.uniform(2, 12)
-    profit_growth = np.random.uniform(8, 30)
-    
+    comparison = kpi_comparison(None, None, None, None, None)
     return {
-        'total_sales': total_sales,
-        'total_orders': total_orders,
-        'avg_order_value': avg_order_value,
-        'total_profit': total_profit,
-        'sales_growth': sales_growth,
-        'orders_growth': orders_growth,
-        'aov_growth': aov_growth,
-        'profit_growth': profit_growth
+        'total_sales': comparison['Total Revenue']['value'],
+        'total_orders': int(comparison['Total Orders']['value']),
+        'avg_order_value': comparison['Avg Order Value']['value'],
+        'total_profit': comparison['Total Profit']['value'],
+        'sales_growth': comparison['Total Revenue']['change'],
+        'orders_growth': comparison['Total Orders']['change'],
+        'aov_growth': comparison['Avg Order Value']['change'],
+        'profit_growth': comparison['Total Profit']['change']
     }
 
 # Layout with advanced components
@@ -321,7 +412,7 @@ app.layout = html.Div([
             html.Div([
                 html.Div([
                     html.I(className="fas fa-bell", style={'font-size': '18px'}),
-                    html.Div("3", className="notification-badge")
+                    html.Div(id="alert-count", className="notification-badge", style={'display': 'none'})
                 ], style={'position': 'relative', 'margin-right': '20px', 'cursor': 'pointer'}),
                 html.Div(id="live-time", style={'font-size': '14px', 'opacity': '0.8'})
             ], style={'display': 'flex', 'align-items': 'center'})
@@ -405,8 +496,8 @@ app.layout = html.Div([
                     
                     html.Hr(style={'border-color': colors['border']}),
                     
-                    # Alerts Section
-                    create_alert_system()
+                    # Alerts Section, filled in with the KPI cards
+                    html.Div(id='alerts-panel')
                     
                 ], className="filter-panel")
             ], width=3),
@@ -535,8 +626,13 @@ app.layout = html.Div([
                         ],
                         data=[],
                         page_size=15,
-                        sort_action="native",
-                        filter_action="native",
+                        page_current=0,
+                        page_action="custom",
+                        sort_action="custom",
+                        sort_mode="single",
+                        sort_by=DEFAULT_SORT,
+                        filter_action="custom",
+                        filter_query='',
                         style_table={'overflowX': 'auto'},
                         style_cell={
                             'textAlign': 'left',
@@ -574,6 +670,10 @@ app.layout = html.Div([
     
     # Store components for data
     dcc.Store(id='filtered-data-store'),
+    dcc.Store(id='data-version', data=cube.version),
+    # Key of the inputs each chart currently shows, so unchanged charts are skipped
+    *[dcc.Store(id=f'{graph}-key') for graph in ['main-trend-chart', 'performance-gauge', 'product-analysis',
+                                                 'geographic-chart', 'temporal-analysis']],
     html.Div(id='dummy-trigger', style={'display': 'none'})
 ], style={'background': colors['background'], 'min-height': '100vh', 'padding': '20px'})
 
@@ -581,133 +681,190 @@ app.layout = html.Div([
 @app.callback(
     Output('kpi-cards-container', 'children'),
     Output('live-time', 'children'),
+    Output('alerts-panel', 'children'),
+    Output('alert-count', 'children'),
+    Output('alert-count', 'style'),
     [Input('interval-component', 'n_intervals'),
-     Input('apply-filters', 'n_clicks')],
+     Input('apply-filters', 'n_clicks'),
+     Input('data-version', 'data')],
     [State('date-range', 'start_date'),
      State('date-range', 'end_date'),
      State('product-filter', 'value'),
      State('country-filter', 'value'),
      State('segment-filter', 'value')]
 )
-def update_kpi_cards(n_intervals, n_clicks, start_date, end_date, products, countries, segments):
+def update_kpi_cards(n_intervals, n_clicks, data_version, start_date, end_date, products, countries, segments):
     # Update live time
     current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
-    # Filter data based on current selections
-    filtered_df = df.copy()
-    if start_date and end_date:
-        filtered_df = filtered_df[
-            (filtered_df['ORDERDATE'] >= pd.to_datetime(start_date)) &
-            (filtered_df['ORDERDATE'] <= pd.to_datetime(end_date))
-        ]
-    if products:
-        filtered_df = filtered_df[filtered_df['PRODUCTLINE'].isin(products)]
-    if countries:
-        filtered_df = filtered_df[filtered_df['COUNTRY'].isin(countries)]
-    if segments:
-        filtered_df = filtered_df[filtered_df['CUSTOMER_SEGMENT'].isin(segments)]
-    
-    # Calculate metrics
-    total_sales = filtered_df['SALES'].sum()
-    total_orders = len(filtered_df)
-    avg_order_value = total_sales / total_orders if total_orders > 0 else 0
-    total_profit = filtered_df['PROFIT'].sum()
+    # KPI values for the selections, with growth against the previous period and the year before
+    filters = (start_date, end_date, products, countries, segments)
+    comparison = kpi_comparison(*filters)
     
-    # Simulate growth rates with some randomness for demo
-    base_growth = [12.5, 8.2, 4.3, 15.7]
-    growth_rates = [base + np.random.uniform(-2, 2) for base in base_growth]
+    def card(name, icon, color, prefix=""):
+        kpi = comparison[name]
+        return dbc.Col([
+            create_advanced_kpi_card(name, kpi['value'], kpi['change'], icon, color, prefix,
+                                     basis=kpi['basis'], yoy=kpi['yoy'])
+        ], width=3)
     
     kpi_cards = dbc.Row([
-        dbc.Col([
-            create_advanced_kpi_card(
-                "Total Revenue", total_sales, growth_rates[0], 
-                "fa-dollar-sign", colors['primary'], "$"
-            )
-        ], width=3),
-        dbc.Col([
-            create_advanced_kpi_card(
-                "Total Orders", total_orders, growth_rates[1], 
-                "fa-shopping-cart", colors['secondary']
-            )
-        ], width=3),
-        dbc.Col([
-            create_advanced_kpi_card(
-                "Avg Order Value", avg_order_value, growth_rates[2], 
-                "fa-chart-bar", colors['success'], "$"
-            )
-        ], width=3),
-        dbc.Col([
-            create_advanced_kpi_card(
-                "Total Profit", total_profit, growth_rates[3], 
-                "fa-coins", colors['warning'], "$"
-            )
-        ], width=3)
+        card("Total Revenue", "fa-dollar-sign", colors['primary'], "$"),
+        card("Total Orders", "fa-shopping-cart", colors['secondary']),
+        card("Avg Order Value", "fa-chart-bar", colors['success'], "$"),
+        card("Total Profit", "fa-coins", colors['warning'], "$")
     ])
+    # Anomalies in the latest closed month, then the selection's notable changes
+    alerts = anomalies.alerts + growth_alerts(comparison, product_movers(*filters))
+    badge = {'display': 'flex' if alerts else 'none'}
     
-    return kpi_cards, f"🕒 Last updated: {current_time}"
+    return kpi_cards, f"🕒 Last updated: {current_time}", create_alert_system(alerts), len(alerts), badge
+
+# Main analytics callbacks: one per chart, so an Apply click only redraws the charts whose inputs changed
+def refresh_figure(graph, draw, filters, shown, *extra):
+    """Figure output for `graph` drawn by draw(*extra, *filters), given what the browser shows now.
+
+    Unchanged inputs send nothing. Otherwise the figure is taken from the
+    figure cache (drawn once per exact inputs, shared by every session). If
+    the browser already shows this chart with the same `extra` arguments
+    (e.g. the trend's time level, which decides its axis type), the layout is
+    unchanged and only the traces are patched in.
+    Returns (figure or patch, shown state) for the chart and its `-key` store.
+    """
+    key = (graph,) + extra + filter_key(*filters)
+    state = {'key': repr(key), 'layout': repr(extra)}
+    if shown == state:
+        return dash.no_update, dash.no_update
+    # Figures are kept as plain dicts: cheap to pickle into the cross-worker cache and to serialize
+    figure = figure_cache.get_or_compute(key, lambda: draw(*extra, *filters).to_dict())
+    if not shown or shown['layout'] != state['layout']:
+        return figure, state
+    patch = Patch()
+    patch['data'] = figure['data']
+    return patch, state
 
-# Main analytics callback
 @app.callback(
-    [Output('main-trend-chart', 'figure'),
-     Output('performance-gauge', 'figure'),
-     Output('product-analysis', 'figure'),
-     Output('geographic-chart', 'figure'),
-     Output('temporal-analysis', 'figure'),
-     Output('data-table', 'data'),
-     Output('filtered-data-store', 'data')],
+    Output('main-trend-chart', 'figure'),
+    Output('main-trend-chart-key', 'data'),
     [Input('apply-filters', 'n_clicks'),
-     Input('dummy-trigger', 'children')],
+     Input('dummy-trigger', 'children'),
+     Input('data-version', 'data')],
     [State('time-filter', 'value'),
      State('date-range', 'start_date'),
      State('date-range', 'end_date'),
      State('product-filter', 'value'),
      State('country-filter', 'value'),
-     State('segment-filter', 'value')]
+     State('segment-filter', 'value'),
+     State('main-trend-chart-key', 'data')]
 )
-def update_all_charts(n_clicks, dummy, time_period, start_date, end_date, products, countries, segments):
-    # Filter data
-    filtered_df = df.copy()
-    
-    if start_date and end_date:
-        filtered_df = filtered_df[
-            (filtered_df['ORDERDATE'] >= pd.to_datetime(start_date)) &
-            (filtered_df['ORDERDATE'] <= pd.to_datetime(end_date))
-        ]
-    
-    if products:
-        filtered_df = filtered_df[filtered_df['PRODUCTLINE'].isin(products)]
-    if countries:
-        filtered_df = filtered_df[filtered_df['COUNTRY'].isin(countries)]
-    if segments:
-        filtered_df = filtered_df[filtered_df['CUSTOMER_SEGMENT'].isin(segments)]
-    
+def update_main_trend_chart(n_clicks, dummy, data_version, time_period, start_date, end_date, products, countries, segments, shown):
+    # The only chart that depends on the Time Aggregation choice
+    level = time_period if time_period in LEVELS else 'monthly'
+    filters = (start_date, end_date, products, countries, segments)
+    return refresh_figure('main-trend-chart', draw_trend, filters, shown, level)
+
+@app.callback(
+    Output('performance-gauge', 'figure'),
+    Output('performance-gauge-key', 'data'),
+    [Input('apply-filters', 'n_clicks'),
+     Input('dummy-trigger', 'children'),
+     Input('data-version', 'data')],
+    [State('date-range', 'start_date'),
+     State('date-range', 'end_date'),
+     State('product-filter', 'value'),
+     State('country-filter', 'value'),
+     State('segment-filter', 'value'),
+     State('performance-gauge-key', 'data')]
+)
+def update_performance_gauge(n_clicks, dummy, data_version, start_date, end_date, products, countries, segments, shown):
+    # Margin gauge over the selection
+    filters = (start_date, end_date, products, countries, segments)
+    return refresh_figure('performance-gauge', draw_gauge, filters, shown)
+
+@app.callback(
+    Output('product-analysis', 'figure'),
+    Output('product-analysis-key', 'data'),
+    [Input('apply-filters', 'n_clicks'),
+     Input('dummy-trigger', 'children'),
+     Input('data-version', 'data')],
+    [State('date-range', 'start_date'),
+     State('date-range', 'end_date'),
+     State('product-filter', 'value'),
+     State('country-filter', 'value'),
+     State('segment-filter', 'value'),
+     State('product-analysis-key', 'data')]
+)
+def update_product_analysis(n_clicks, dummy, data_version, start_date, end_date, products, countries, segments, shown):
+    # Sales share by product line
+    filters = (start_date, end_date, products, countries, segments)
+    return refresh_figure('product-analysis', draw_products, filters, shown)
+
+@app.callback(
+    Output('geographic-chart', 'figure'),
+    Output('geographic-chart-key', 'data'),
+    [Input('apply-filters', 'n_clicks'),
+     Input('dummy-trigger', 'children'),
+     Input('data-version', 'data')],
+    [State('date-range', 'start_date'),
+     State('date-range', 'end_date'),
+     State('product-filter', 'value'),
+     State('country-filter', 'value'),
+     State('segment-filter', 'value'),
+     State('geographic-chart-key', 'data')]
+)
+def update_geographic_chart(n_clicks, dummy, data_version, start_date, end_date, products, countries, segments, shown):
+    # Sales by country
+    filters = (start_date, end_date, products, countries, segments)
+    return refresh_figure('geographic-chart', draw_geography, filters, shown)
+
+@app.callback(
+    Output('temporal-analysis', 'figure'),
+    Output('temporal-analysis-key', 'data'),
+    [Input('apply-filters', 'n_clicks'),
+     Input('dummy-trigger', 'children'),
+     Input('data-version', 'data')],
+    [State('date-range', 'start_date'),
+     State('date-range', 'end_date'),
+     State('product-filter', 'value'),
+     State('country-filter', 'value'),
+     State('segment-filter', 'value'),
+     State('temporal-analysis-key', 'data')]
+)
+def update_temporal_analysis(n_clicks, dummy, data_version, start_date, end_date, products, countries, segments, shown):
+    # Sales by weekday and month
+    filters = (start_date, end_date, products, countries, segments)
+    return refresh_figure('temporal-analysis', draw_heatmap, filters, shown)
+
+# Handle to the filtered orders for the transaction table; re-sent only when the selection changes
+@app.callback(
+    Output('filtered-data-store', 'data'),
+    [Input('apply-filters', 'n_clicks'),
+     Input('dummy-trigger', 'children'),
+     Input('data-version', 'data')],
+    [State('date-range', 'start_date'),
+     State('date-range', 'end_date'),
+     State('product-filter', 'value'),
+     State('country-filter', 'value'),
+     State('segment-filter', 'value'),
+     State('filtered-data-store', 'data')]
+)
+def update_orders_handle(n_clicks, dummy, data_version, start_date, end_date, products, countries, segments, shown):
+    handle = orders_handle(start_date, end_date, products, countries, segments)
+    # JSON turns the key's tuples into lists, so compare in that form
+    return dash.no_update if shown == json.loads(json.dumps(handle)) else handle
+
+# Chart drawing; charts are answered from the cube, raw rows are only needed for the table
+def draw_trend(level, start_date, end_date, products, countries, segments):
     # Main trend chart - Advanced multi-metric visualization
-    time_mapping = {
-        'daily': 'ORDERDATE',
-        'weekly': 'Week',
-        'monthly': 'Month-Year',
-        'quarterly': 'Quarter-Year',
-        'yearly': 'Year'
-    }
-    
-    time_col = time_mapping.get(time_period, 'Month-Year')
-    
-    if time_period == 'daily':
-        trend_data = filtered_df.groupby(filtered_df['ORDERDATE'].dt.date).agg({
-            'SALES': 'sum',
-            'PROFIT': 'sum',
-            'QUANTITYORDERED': 'sum'
-        }).reset_index()
-        trend_data.columns = ['Date', 'SALES', 'PROFIT', 'QUANTITY']
-        x_col = 'Date'
-    else:
-        trend_data = filtered_df.groupby(time_col).agg({
-            'SALES': 'sum',
-            'PROFIT': 'sum',
-            'QUANTITYORDERED': 'sum'
-        }).reset_index()
-        trend_data.columns = [time_col, 'SALES', 'PROFIT', 'QUANTITY']
-        x_col = time_col
+    # Every granularity is precomputed per filter state, so switching time-filter is a lookup
+    rollup = trend_rollups(start_date, end_date, products, countries, segments)[level]
+    trend_data = pd.DataFrame({
+        'Period': period_axis(level, rollup['period']),
+        'SALES': rollup['SALES'],
+        'PROFIT': rollup['PROFIT'],
+        'QUANTITY': rollup['QUANTITYORDERED']
+    })
+    x_col = 'Period'
     
     # Create main trend chart with subplots
     main_fig = make_subplots(
@@ -784,10 +941,13 @@ def update_all_charts(n_clicks, dummy, time_period, start_date, end_date, produc
         showgrid=True,
         zeroline=False
     )
-    
+    return main_fig
+
+def draw_gauge(start_date, end_date, products, countries, segments):
     # Performance gauge chart
-    total_sales = filtered_df['SALES'].sum()
-    total_profit = filtered_df['PROFIT'].sum()
+    totals = filter_totals(start_date, end_date, products, countries, segments)
+    total_sales = totals['SALES']
+    total_profit = totals['PROFIT']
     profit_margin = (total_profit / total_sales * 100) if total_sales > 0 else 0
     
     gauge_fig = go.Figure()
@@ -815,8 +975,8 @@ def update_all_charts(n_clicks, dummy, time_period, start_date, end_date, produc
         }
     ))
     
-    # Order fulfillment rate (simulated metric)
-    fulfillment_rate = np.random.uniform(85, 98)
+    # Share of the selected order lines that shipped or were resolved
+    fulfillment_rate = totals['FULFILLED'] / totals['ORDERS'] * 100 if totals['ORDERS'] else 0
     gauge_fig.add_trace(go.Indicator(
         mode="gauge+number",
         value=fulfillment_rate,
@@ -840,13 +1000,12 @@ def update_all_charts(n_clicks, dummy, time_period, start_date, end_date, produc
         font=dict(color=colors['text'], family='Inter'),
         margin=dict(l=20, r=20, t=20, b=20)
     )
-    
+    return gauge_fig
+
+def draw_products(start_date, end_date, products, countries, segments):
     # Product analysis - Enhanced treemap
-    product_data = filtered_df.groupby('PRODUCTLINE').agg({
-        'SALES': 'sum',
-        'PROFIT': 'sum',
-        'QUANTITYORDERED': 'sum'
-    }).reset_index()
+    selected = select_cells(start_date, end_date, products, countries, segments)
+    product_data = cube.by('PRODUCTLINE', selected)
     product_data['PROFIT_MARGIN'] = (product_data['PROFIT'] / product_data['SALES'] * 100)
     
     product_fig = go.Figure(go.Treemap(
@@ -876,13 +1035,12 @@ def update_all_charts(n_clicks, dummy, time_period, start_date, end_date, produc
         font=dict(color=colors['text'], family='Inter'),
         margin=dict(l=20, r=20, t=20, b=20)
     )
-    
+    return product_fig
+
+def draw_geography(start_date, end_date, products, countries, segments):
     # Geographic distribution - Enhanced map
-    geo_data = filtered_df.groupby('COUNTRY').agg({
-        'SALES': 'sum',
-        'PROFIT': 'sum',
-        'QUANTITYORDERED': 'sum'
-    }).reset_index()
+    selected = select_cells(start_date, end_date, products, countries, segments)
+    geo_data = cube.by('COUNTRY', selected)
     
     geo_fig = go.Figure(go.Choropleth(
     locations=geo_data['COUNTRY'],
@@ -913,12 +1071,12 @@ def update_all_charts(n_clicks, dummy, time_period, start_date, end_date, produc
         ),
         margin=dict(l=20, r=20, t=20, b=20)
     )
+    return geo_fig
+
+def draw_heatmap(start_date, end_date, products, countries, segments):
     # Temporal analysis - Heatmap by weekday and month
-    temporal_data = filtered_df.copy()
-    temporal_data['Weekday_Num'] = temporal_data['ORDERDATE'].dt.dayofweek
-    temporal_data['Month_Num'] = temporal_data['ORDERDATE'].dt.month
-    
-    heatmap_data = temporal_data.groupby(['Weekday', 'Month_Name'])['SALES'].sum().unstack(fill_value=0)
+    selected = select_cells(start_date, end_date, products, countries, segments)
+    heatmap_data = cube.weekday_month(selected, 'SALES')
     
     temporal_fig = go.Figure(go.Heatmap(
         z=heatmap_data.values,
@@ -955,16 +1113,31 @@ def update_all_charts(n_clicks, dummy, time_period, start_date, end_date, produc
         margin=dict(l=20, r=20, t=20, b=20)
     )
     
-    # Prepare table data
-    table_data = filtered_df.sort_values('ORDERDATE', ascending=False).head(50)
-    table_data_formatted = table_data[[
-        'ORDERNUMBER', 'ORDERDATE', 'COUNTRY', 'PRODUCTLINE', 
-        'QUANTITYORDERED', 'SALES', 'PROFIT', 'PROFIT_MARGIN'
-    ]].copy()
-    table_data_formatted['ORDERDATE'] = table_data_formatted['ORDERDATE'].dt.strftime('%Y-%m-%d')
-    
-    return (main_fig, gauge_fig, product_fig, geo_fig, temporal_fig, 
-            table_data_formatted.to_dict('records'), filtered_df.to_dict('records'))
+    return temporal_fig
+
+# Transaction table: paged, sorted and filtered on the server from the filtered-data-store handle
+@app.callback(
+    Output('data-table', 'data'),
+    Output('data-table', 'page_count'),
+    Output('data-table', 'page_current'),
+    Input('filtered-data-store', 'data'),
+    Input('data-table', 'page_current'),
+    Input('data-table', 'page_size'),
+    Input('data-table', 'sort_by'),
+    Input('data-table', 'filter_query')
+)
+def update_table(handle, page_current, page_size, sort_by, filter_query):
+    if not handle:
+        return [], 0, 0
+    # A new selection, sort or table filter starts again from the first page
+    if 'data-table.page_current' not in ctx.triggered_prop_ids:
+        page_current = 0
+    key = (repr(handle['key']), repr(sort_by), filter_query)
+    positions = table_views.get_or_compute(
+        key, lambda: order_table.view(orders_store.get(handle), sort_by, filter_query))
+    page_count = max(1, -(-len(positions) // page_size))
+    page_current = min(page_current or 0, page_count - 1)
+    return order_table.page(positions, page_current, page_size), page_count, page_current
 
 # AI Prediction callback
 @app.callback(
@@ -984,29 +1157,15 @@ def make_prediction(n_clicks, qty, price, msrp, country, product):
                    style={'color': colors['text_secondary'], 'text-align': 'center'})
         ])
     
-    # Simple prediction calculation (replace with actual model)
-    base_prediction = qty * price
-    
-    # Apply country multiplier
-    country_multipliers = {
-        'USA': 1.2, 'UK': 1.1, 'France': 1.0, 'Germany': 1.15,
-        'Japan': 1.3, 'Australia': 0.9
-    }
-    country_mult = country_multipliers.get(country, 1.0)
-    
-    # Apply product multiplier
-    product_multipliers = {
-        'Motorcycles': 1.3, 'Classic Cars': 1.5, 'Trucks': 1.1,
-        'Vintage Cars': 1.8, 'Planes': 2.0, 'Ships': 1.4
-    }
-    product_mult = product_multipliers.get(product, 1.0)
-    
-    # Calculate final prediction
-    prediction = base_prediction * country_mult * product_mult
+    if None in (qty, price, msrp, country, product):
+        return html.P("Fill in every parameter to get a prediction",
+                      style={'color': colors['text_secondary'], 'text-align': 'center'})
     
-    # Calculate confidence interval
-    confidence_lower = prediction * 0.85
-    confidence_upper = prediction * 1.15
+    # Trained random forest; the confidence range is the spread of its trees
+    prediction, confidence_lower, confidence_upper = predictor.predict(qty, price, msrp, country, product)
+    if np.isnan(prediction):
+        return html.P(f"The model has no training data for {product} in {country}",
+                      style={'color': colors['text_secondary'], 'text-align': 'center'})
     
     # Determine prediction quality
     margin = (price - msrp * 0.6) / price * 100 if price > 0 else 0
@@ -1066,6 +1225,22 @@ def make_prediction(n_clicks, qty, price, msrp, country, product):
         })
     ])
 
+# Live data: each refresh tick pulls in new orders; a new data version redraws the KPIs and charts
+@app.callback(
+    Output('data-version', 'data'),
+    Output('date-range', 'end_date'),
+    Input('interval-component', 'n_intervals'),
+    State('data-version', 'data'),
+    State('date-range', 'end_date')
+)
+def poll_live_data(n_intervals, seen_version, end_date):
+    live_ingest.poll()
+    if cube.version == seen_version:
+        return dash.no_update, dash.no_update
+    # A range ending on the latest day keeps following the data as it grows
+    follows = end_date and pd.Timestamp(end_date).normalize() in latest_dates
+    return cube.version, (latest_dates[-1] if follows else dash.no_update)
+
 # Initialize dashboard on page load
 @app.callback(
     Output('dummy-trigger', 'children'),
@@ -1075,4 +1250,11 @@ def trigger_initial_load(_):
     return 'loaded'
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Enterprise Sales Analytics Suite")
+    parser.add_argument('--live', action='append', default=[], metavar='SOURCE',
+                        help="tail new orders from a CSV/JSONL drop file or an SQLite table "
+                             "(orders.csv, orders.jsonl, orders.db[:table]); may be repeated")
+    args = parser.parse_args()
+    for source in args.live:
+        live_ingest.add_source(source)
     app.run(debug=True)
\ No newline at end of file
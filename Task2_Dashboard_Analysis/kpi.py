@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+from cube import COUNT, MEASURES, day_of, from_day
+
+# KPI cards: name -> (measure, divisor measure or None)
+KPIS = {
+    'Total Revenue': ('SALES', None),
+    'Total Orders': (COUNT, None),
+    'Avg Order Value': ('SALES', COUNT),
+    'Total Profit': ('PROFIT', None),
+}
+# Used instead of "the previous equal-length window" when that window falls before the first order
+TRAILING_DAYS = 30
+
+
+def kpi_values(sums):
+    return {name: (sums[m] / sums[d] if sums[d] else 0.0) if d else sums[m] for name, (m, d) in KPIS.items()}
+
+
+def growth(current, previous):
+    """Percent change, or None when there is nothing to compare against"""
+    return (current - previous) / abs(previous) * 100 if previous else None
+
+
+def year_earlier(day):
+    """The same calendar day a year before (28 Feb for 29 Feb)"""
+    return day_of(from_day([day])[0] - pd.DateOffset(years=1))
+
+
+class PeriodTotals:
+    """Running totals of every measure over consecutive days, for one filter state.
+
+    Built once from the cube's per-day totals (SalesCube.by_day); after that
+    the sum over any date window is the difference of two prefix-sum entries,
+    so each KPI and its comparisons cost O(1) however long the history is.
+    `first`/`last` fix the day axis (e.g. to the whole dataset's), so every
+    filter state measures "previous period" and "latest days" alike.
+    """
+
+    def __init__(self, daily, first=None, last=None):
+        days = daily['day'].to_numpy(dtype=np.int64)
+        if first is None:
+            first = days[0] if len(days) else 0
+        if last is None:
+            last = days[-1] if len(days) else first - 1
+        self.first, self.span = int(first), max(int(last) - int(first) + 1, 0)
+        inside = (days >= first) & (days <= last)
+        self.prefix = {}
+        for m in MEASURES + [COUNT]:
+            dense = np.zeros(self.span)
+            dense[days[inside] - self.first] = daily[m].to_numpy(dtype=float)[inside]
+            self.prefix[m] = np.concatenate([[0.0], np.cumsum(dense)])
+
+    @property
+    def last(self):
+        return self.first + self.span - 1
+
+    def window(self, start, end):
+        """Sum of each measure over days start..end (inclusive, int days since 1970)"""
+        lo = min(max(start - self.first, 0), self.span)
+        hi = min(max(end - self.first + 1, 0), self.span)
+        return {m: float(p[hi] - p[lo]) if hi > lo else 0.0 for m, p in self.prefix.items()}
+
+    def compare(self, start_date=None, end_date=None):
+        """KPI values for a date range, with growth against the previous period and a year earlier.
+
+        The previous period is the equal-length window just before the range.
+        When that window lies before the first order (e.g. the range covers
+        all the data), the range's last TRAILING_DAYS days are compared with
+        the TRAILING_DAYS days before them instead. Year-over-year growth
+        compares the same days (the range, or those last days) with a year
+        earlier. Growth is None where the comparison window has no orders.
+        """
+        start = day_of(start_date) if start_date and end_date else self.first
+        end = day_of(end_date) if start_date and end_date else self.last
+        length = end - start + 1
+        current = kpi_values(self.window(start, end))
+        if start - length >= self.first:
+            recent_start, recent, basis = start, current, f"vs previous {length} days"
+        else:
+            recent_start = end - TRAILING_DAYS + 1
+            recent, basis = kpi_values(self.window(recent_start, end)), f"last {TRAILING_DAYS} days vs prior {TRAILING_DAYS}"
+        previous = kpi_values(self.window(2 * recent_start - end - 1, recent_start - 1))
+        year_ago = kpi_values(self.window(year_earlier(recent_start), year_earlier(end)))
+        return {name: {'value': value,
+                       'change': growth(recent[name], previous[name]),
+                       'yoy': growth(recent[name], year_ago[name]),
+                       'basis': basis}
+                for name, value in current.items()}
+
+
+def growth_alerts(comparison, movers=(), threshold=10.0):
+    """Alert panel entries for KPI and product-line changes of at least `threshold` percent.
+
+    `movers` is [(label, comparison)] for the parts of the selection (e.g.
+    product lines); only the biggest riser and faller among them are named.
+    """
+    alerts = []
+    basis = comparison['Total Revenue']['basis']
+    for name in ('Total Revenue', 'Total Profit', 'Avg Order Value'):
+        change = comparison[name]['change']
+        if change is not None and abs(change) >= threshold:
+            alerts.append({'type': 'success' if change > 0 else 'warning',
+                           'message': f"{name.replace('Total ', '')} "
+                                      f"{'up' if change > 0 else 'down'} {abs(change):.1f}% "
+                                      f"({comparison[name]['basis']})",
+                           'icon': 'fa-check-circle' if change > 0 else 'fa-exclamation-triangle'})
+    ranked = sorted((c['Total Revenue']['change'], label) for label, c in movers
+                    if c['Total Revenue']['change'] is not None)
+    if ranked and ranked[-1][0] >= threshold:
+        alerts.append({'type': 'success', 'icon': 'fa-check-circle',
+                       'message': f"{ranked[-1][1]} revenue up {ranked[-1][0]:.1f}% ({basis})"})
+    if ranked and ranked[0][0] <= -threshold:
+        alerts.append({'type': 'warning', 'icon': 'fa-exclamation-triangle',
+                       'message': f"{ranked[0][1]} revenue down {-ranked[0][0]:.1f}% ({basis})"})
+    return alerts
@@ -0,0 +1,166 @@
+"""Callback latency under concurrent sessions, against a running dashboard.
+
+    python serve.py --workers 4 &
+    python loadtest.py --sessions 50 --duration 60
+
+Each session is a thread acting like one user: it picks a filter state and
+fires the callbacks an "Apply Filters" click triggers (KPI cards, each
+chart, the orders handle, then the table page when the handle changed),
+waits, and repeats. Like a browser, it sends back each chart's key store,
+so charts whose inputs did not change cost an empty reply. Filter states
+are drawn from a limited pool, as many users looking at the same few
+views would. Reports p50/p99 latency per callback and overall.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+FILTER_IDS = ['time-filter', 'date-range', 'product-filter', 'country-filter', 'segment-filter']
+LEVELS = ['daily', 'weekly', 'monthly', 'quarterly', 'yearly']
+GRAPHS = ['main-trend-chart', 'performance-gauge', 'product-analysis', 'geographic-chart', 'temporal-analysis']
+
+
+def find_props(node, wanted, found):
+    """Props of the components in a /_dash-layout tree whose id is in `wanted`"""
+    if isinstance(node, dict):
+        props = node.get('props')
+        if isinstance(props, dict) and props.get('id') in wanted:
+            found[props['id']] = props
+        for value in node.values():
+            find_props(value, wanted, found)
+    elif isinstance(node, list):
+        for value in node:
+            find_props(value, wanted, found)
+    return found
+
+
+def prop(id, property, value=None):
+    return {'id': id, 'property': property, 'value': value}
+
+
+def payload(outputs, inputs, state, changed):
+    if len(outputs) == 1:
+        output, outputs = f"{outputs[0][0]}.{outputs[0][1]}", {'id': outputs[0][0], 'property': outputs[0][1]}
+    else:
+        output = '..' + '...'.join(f"{id}.{p}" for id, p in outputs) + '..'
+        outputs = [{'id': id, 'property': p} for id, p in outputs]
+    return {'output': output, 'outputs': outputs, 'inputs': inputs, 'state': state, 'changedPropIds': changed}
+
+
+class LoadTest:
+    def __init__(self, url, sessions, duration, think):
+        self.url = url.rstrip('/')
+        self.sessions = sessions
+        self.duration = duration
+        self.think = think
+        self.latencies = {}  # callback -> [seconds]
+        self.errors = {}
+        self.lock = threading.Lock()
+        layout = json.load(urllib.request.urlopen(self.url + '/_dash-layout'))
+        props = find_props(layout, set(FILTER_IDS), {})
+        self.products = [o['value'] for o in props['product-filter']['options']]
+        self.countries = [o['value'] for o in props['country-filter']['options']]
+        self.start_date = props['date-range']['start_date']
+        self.end_date = props['date-range']['end_date']
+
+    def filter_states(self, rng):
+        products = rng.choice([None] + [[p] for p in self.products])
+        countries = rng.choice([None] + [[c] for c in self.countries])
+        return [prop('time-filter', 'value', rng.choice(LEVELS)),
+                prop('date-range', 'start_date', self.start_date),
+                prop('date-range', 'end_date', self.end_date),
+                prop('product-filter', 'value', products or self.products),
+                prop('country-filter', 'value', countries or self.countries),
+                prop('segment-filter', 'value', [])]
+
+    def call(self, name, body):
+        request = urllib.request.Request(self.url + '/_dash-update-component', data=json.dumps(body).encode(),
+                                         headers={'Content-Type': 'application/json'})
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                # 204 when nothing needed updating
+                result = json.load(response) if response.status == 200 else {'response': {}}
+        except Exception:
+            with self.lock:
+                self.errors[name] = self.errors.get(name, 0) + 1
+            return None
+        with self.lock:
+            self.latencies.setdefault(name, []).append(time.perf_counter() - started)
+        return result
+
+    def session(self, seed, deadline):
+        rng = random.Random(seed)
+        clicks = 0
+        shown = {}  # what this "browser" holds in each chart's key store
+        while time.monotonic() < deadline:
+            clicks += 1
+            states = self.filter_states(rng)
+            inputs = [prop('apply-filters', 'n_clicks', clicks), prop('dummy-trigger', 'children', 'loaded'),
+                      prop('data-version', 'data')]
+            self.call('kpi-cards', payload(
+                [('kpi-cards-container', 'children'), ('live-time', 'children'), ('alerts-panel', 'children'),
+                 ('alert-count', 'children'), ('alert-count', 'style')],
+                [prop('interval-component', 'n_intervals', 0), inputs[0], inputs[2]], states[1:],
+                ['apply-filters.n_clicks']))
+            for graph in GRAPHS:
+                chart_states = (states if graph == 'main-trend-chart' else states[1:])
+                result = self.call(graph, payload(
+                    [(graph, 'figure'), (graph + '-key', 'data')], inputs,
+                    chart_states + [prop(graph + '-key', 'data', shown.get(graph))], ['apply-filters.n_clicks']))
+                if result and graph in result['response']:
+                    shown[graph] = result['response'][graph + '-key']['data']
+            result = self.call('orders-handle', payload(
+                [('filtered-data-store', 'data')], inputs,
+                states[1:] + [prop('filtered-data-store', 'data', shown.get('handle'))], ['apply-filters.n_clicks']))
+            if result and 'filtered-data-store' in result['response']:
+                shown['handle'] = result['response']['filtered-data-store']['data']
+                self.call('table', payload(
+                    [('data-table', 'data'), ('data-table', 'page_count'), ('data-table', 'page_current')],
+                    [prop('filtered-data-store', 'data', shown['handle']), prop('data-table', 'page_current', 0),
+                     prop('data-table', 'page_size', 15),
+                     prop('data-table', 'sort_by', [{'column_id': 'ORDERDATE', 'direction': 'desc'}]),
+                     prop('data-table', 'filter_query', '')],
+                    [], ['filtered-data-store.data']))
+            time.sleep(rng.uniform(0, 2 * self.think))
+
+    def run(self):
+        deadline = time.monotonic() + self.duration
+        threads = [threading.Thread(target=self.session, args=(i, deadline)) for i in range(self.sessions)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.monotonic() - started
+
+    def report(self, elapsed):
+        print(f"{self.sessions} sessions for {elapsed:.0f}s against {self.url}")
+        print(f"{'callback':<20}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}")
+        rows = [(name, times) for name, times in sorted(self.latencies.items())]
+        rows.append(('all', [t for times in self.latencies.values() for t in times]))
+        for name, times in rows:
+            errors = sum(self.errors.values()) if name == 'all' else self.errors.get(name, 0)
+            p50, p99 = np.percentile(times, [50, 99]) * 1000 if times else (float('nan'),) * 2
+            print(f"{name:<20}{len(times):>10}{errors:>8}{p50:>10.1f}{p99:>10.1f}")
+        print(f"throughput: {len(rows[-1][1]) / elapsed:.1f} callbacks/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the dashboard's callbacks")
+    parser.add_argument('--url', default='http://127.0.0.1:8050')
+    parser.add_argument('--sessions', type=int, default=50, help="concurrent simulated users")
+    parser.add_argument('--duration', type=float, default=60, help="seconds to run")
+    parser.add_argument('--think', type=float, default=0.5, help="mean pause between a user's filter clicks (s)")
+    args = parser.parse_args()
+    test = LoadTest(args.url, args.sessions, args.duration, args.think)
+    test.report(test.run())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+MODEL_PATH = 'model/sales_model.pkl'
+PRODUCT_ENCODER_PATH = 'model/le_product.pkl'
+COUNTRY_ENCODER_PATH = 'model/le_country.pkl'
+DATA_PATH = 'data/sales_data_sample.csv'
+
+# Inputs of one prediction, in the order the prediction panel and the batch endpoint use
+INPUTS = ['qty', 'price', 'msrp', 'country', 'product']
+# Model features, as engineered in eda_notebook.ipynb
+FEATURES = ['QUANTITYORDERED', 'PRICEEACH', 'MSRP', 'DISCOUNT', 'UNIT_PROFIT',
+            'IS_BIG_ORDER', 'COUNTRY_ENC', 'PRODUCTLINE_ENC']
+
+
+def build_features(qty, price, msrp, country_codes, product_codes):
+    """Feature matrix for arrays of inputs (codes from the label encoders)"""
+    qty = np.asarray(qty, dtype=float)
+    price = np.asarray(price, dtype=float)
+    msrp = np.asarray(msrp, dtype=float)
+    return np.column_stack([qty, price, msrp, msrp - price, price - msrp * 0.5,
+                            (qty > 30).astype(float), country_codes, product_codes])
+
+
+def train(df, le_product=None, le_country=None, n_estimators=100):
+    """Fit the random forest the way the notebook does (and the encoders, unless given).
+
+    Returns (model, le_product, le_country).
+    """
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import LabelEncoder
+    df = df[pd.to_numeric(df['SALES'], errors='coerce') > 0]
+    le_product = le_product or LabelEncoder().fit(df['PRODUCTLINE'])
+    le_country = le_country or LabelEncoder().fit(df['COUNTRY'])
+    X = build_features(df['QUANTITYORDERED'], df['PRICEEACH'], df['MSRP'],
+                       le_country.transform(df['COUNTRY']), le_product.transform(df['PRODUCTLINE']))
+    model = RandomForestRegressor(n_estimators=n_estimators, random_state=42)
+    model.fit(X, df['SALES'].to_numpy(dtype=float))
+    return model, le_product, le_country
+
+
+def dump_atomic(obj, path):
+    """joblib.dump to a temporary file beside `path`, then rename it into place, so no reader sees half a file"""
+    import joblib
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+
+class SalesPredictor:
+    """The trained sales regressor, loaded on first use and shared by every caller.
+
+    If the model file is missing (it is too large to keep in the repository)
+    it is trained from the sample CSV on first use, or by prepare(), and
+    saved for later runs.
+    Country and product labels are mapped to encoder codes through plain
+    dicts built once at load, instead of calling LabelEncoder.transform per
+    prediction. Labels the model has never seen predict NaN.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, product_path=PRODUCT_ENCODER_PATH,
+                 country_path=COUNTRY_ENCODER_PATH, data_path=DATA_PATH):
+        self.model_path = model_path
+        self.product_path = product_path
+        self.country_path = country_path
+        self.data_path = data_path
+        self.model = None
+        self.codes = None  # {'country': {label: code}, 'product': {label: code}}
+        self.lock = threading.Lock()
+
+    def _saved(self):
+        return all(os.path.exists(path) for path in (self.model_path, self.product_path, self.country_path))
+
+    def _train(self):
+        """Train from the sample CSV (keeping encoders already saved) and save the results"""
+        import joblib
+        encoders = [joblib.load(path) if os.path.exists(path) else None
+                    for path in (self.product_path, self.country_path)]
+        model, le_product, le_country = train(pd.read_csv(self.data_path, encoding='latin1'), *encoders)
+        os.makedirs(os.path.dirname(self.model_path) or '.', exist_ok=True)
+        for obj, path in ((model, self.model_path), (le_product, self.product_path),
+                          (le_country, self.country_path)):
+            if obj is model or not os.path.exists(path):
+                dump_atomic(obj, path)
+        return model, le_product, le_country
+
+    def prepare(self):
+        """Train and save the model if it is missing, without loading it.
+
+        serve.py calls this before starting its workers, so they only load a
+        finished file instead of each training its own on a first prediction.
+        """
+        with self.lock:
+            if not self._saved():
+                self._train()
+
+    def load(self):
+        """Load (or train) the model now rather than on the first prediction"""
+        with self.lock:
+            if self.model is not None:
+                return
+            if self._saved():
+                import joblib
+                model, le_product, le_country = (joblib.load(path) for path in
+                                                 (self.model_path, self.product_path, self.country_path))
+            else:
+                model, le_product, le_country = self._train()
+            self.codes = {'country': {label: code for code, label in enumerate(le_country.classes_)},
+                          'product': {label: code for code, label in enumerate(le_product.classes_)}}
+            self.model = model
+
+    def _codes(self, kind, labels):
+        codes = self.codes[kind]
+        labels = pd.Series(labels, dtype=object)
+        # Map each distinct label once; a batch usually repeats a handful of them
+        return labels.map({label: codes.get(label, np.nan) for label in labels.unique()}).to_numpy(dtype=float)
+
+    def predict_batch(self, rows):
+        """Predicted SALES for every row of `rows` (a DataFrame, or anything pd.DataFrame accepts, with INPUTS columns)"""
+        self.load()
+        rows = pd.DataFrame(rows)
+        missing = [col for col in INPUTS if col not in rows.columns]
+        if missing:
+            raise ValueError(f"missing inputs: {', '.join(missing)}")
+        country, product = self._codes('country', rows['country']), self._codes('product', rows['product'])
+        X = build_features(rows['qty'], rows['price'], rows['msrp'], country, product)
+        known = ~(np.isnan(X).any(axis=1))
+        predictions = np.full(len(rows), np.nan)
+        if known.any():
+            predictions[known] = self._per_tree(X[known]).mean(axis=0)
+        return predictions
+
+    def _per_tree(self, X):
+        """Every tree's predictions, shape (trees, rows); the forest's prediction is their mean.
+
+        Calls each fitted tree on float32 input, as the forest's own predict()
+        does, with check_input=False to skip the per-call validation and
+        without the forest's thread pool, which dominate the cost of
+        predicting a single row.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        return np.stack([tree.predict(X, check_input=False) for tree in self.model.estimators_])
+
+    def predict(self, qty, price, msrp, country, product):
+        """(prediction, low, high) for one order; low/high span the middle 80% of the forest's trees"""
+        self.load()
+        X = build_features([qty], [price], [msrp], self._codes('country', [country]), self._codes('product', [product]))
+        if np.isnan(X).any():
+            return np.nan, np.nan, np.nan
+        per_tree = self._per_tree(X)[:, 0]
+        low, high = np.percentile(per_tree, [10, 90])
+        return per_tree.mean(), low, high
@@ -0,0 +1,92 @@
+import glob
+import hashlib
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from colstore import META_FILE, save_frame
+
+SEGMENT_BINS = [0, 1000, 5000, 20000, float('inf')]
+SEGMENT_LABELS = ['Low Value', 'Medium Value', 'High Value', 'Premium']
+# Part of every cache key: bump it when enrich() or anything cached beside a store (colstore.cached)
+# changes, so what older code built is not reused
+CACHE_VERSION = 2
+# Order statuses that count as fulfilled for the fulfillment gauge
+FULFILLED_STATUSES = ['Shipped', 'Resolved']
+
+
+def enrich(df):
+    """Date parts and calculated metrics for raw order rows (row-local, so safe to run on new rows only)"""
+    df = df.copy()
+    # Advanced data preprocessing
+    df['ORDERDATE'] = pd.to_datetime(df['ORDERDATE'])
+    df['Month'] = df['ORDERDATE'].dt.month
+    df['Year'] = df['ORDERDATE'].dt.year
+    df['Quarter'] = df['ORDERDATE'].dt.quarter
+    df['Week'] = df['ORDERDATE'].dt.isocalendar().week
+
+    # Advanced calculated metrics
+    df['PROFIT'] = (df['PRICEEACH'] - df['MSRP'] * 0.6) * df['QUANTITYORDERED']
+    df['PROFIT_MARGIN'] = (df['PROFIT'] / df['SALES']) * 100
+    df['DISCOUNT'] = df['MSRP'] - df['PRICEEACH']
+    df['DISCOUNT_RATE'] = (df['DISCOUNT'] / df['MSRP']) * 100
+    df['REVENUE_PER_UNIT'] = df['SALES'] / df['QUANTITYORDERED']
+    df['CUSTOMER_SEGMENT'] = pd.cut(df['SALES'], bins=SEGMENT_BINS, labels=SEGMENT_LABELS)
+    # 1 for an order line that shipped or was resolved, so summing gives the fulfilled count
+    df['FULFILLED'] = df['STATUS'].isin(FULFILLED_STATUSES).astype(float)
+    return df
+
+
+def sample_orders():
+    """Generated demo orders, used when the real data files are missing"""
+    np.random.seed(42)
+    dates = pd.date_range('2020-01-01', '2024-12-31', freq='D')
+    return pd.DataFrame({
+        'ORDERNUMBER': range(1, 1001),
+        'ORDERDATE': np.random.choice(dates, 1000),
+        'COUNTRY': np.random.choice(['USA', 'UK', 'France', 'Germany', 'Japan', 'Australia'], 1000),
+        'PRODUCTLINE': np.random.choice(['Motorcycles', 'Classic Cars', 'Trucks', 'Vintage Cars', 'Planes', 'Ships'], 1000),
+        'QUANTITYORDERED': np.random.randint(10, 100, 1000),
+        'PRICEEACH': np.random.uniform(20, 200, 1000),
+        'MSRP': np.random.uniform(25, 250, 1000),
+        'SALES': np.random.uniform(1000, 50000, 1000),
+        'STATUS': np.random.choice(['Shipped', 'Resolved', 'In Process', 'On Hold', 'Cancelled'], 1000,
+                                   p=[0.9, 0.02, 0.03, 0.03, 0.02])
+    })
+
+
+def load_orders(path):
+    """Enriched orders from the sales CSV, or sample_orders() if it cannot be read"""
+    try:
+        df = pd.read_csv(path, encoding='latin1')
+    except (OSError, ValueError):
+        df = sample_orders()
+    return enrich(df)
+
+
+def source_key(path):
+    """Short hash of the file's bytes and CACHE_VERSION"""
+    digest = hashlib.sha1(f"v{CACHE_VERSION}".encode())
+    with open(path, 'rb') as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def prepare_orders(path, cache_dir):
+    """Column store (colstore.py) of the enriched orders in `path`; parsed and enriched only on a cache miss.
+
+    The store is named after a hash of the source file, so a changed file
+    gets a new store and an unchanged one is never parsed again. Stores
+    built from earlier versions of the same file are removed.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    store = os.path.join(cache_dir, f"{name}-{source_key(path)}")
+    if not os.path.exists(os.path.join(store, META_FILE)):
+        save_frame(enrich(pd.read_csv(path, encoding='latin1')), store)
+        for old in glob.glob(os.path.join(cache_dir, f"{name}-*")):
+            if old != store and '.' not in os.path.basename(old):  # leave other writers' temp dirs alone
+                shutil.rmtree(old, ignore_errors=True)
+    return store
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+from cube import from_day
+
+# Trend granularities offered by the time-filter dropdown
+LEVELS = ['daily', 'weekly', 'monthly', 'quarterly', 'yearly']
+
+
+def _roll(frame, keys):
+    """Sum consecutive rows sharing a key; keys are non-decreasing, so groups are contiguous runs"""
+    keys = np.asarray(keys, dtype=np.int64)
+    out = {'period': keys}
+    if len(keys):
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        out['period'] = keys[starts]
+    for col in frame.columns.drop('period'):
+        values = frame[col].to_numpy(dtype=float)
+        out[col] = np.add.reduceat(values, starts) if len(keys) else values
+    return pd.DataFrame(out)
+
+
+def build_rollups(daily):
+    """Every trend level for a per-day frame (`day` plus measures), keyed by integer periods.
+
+    Periods count from 1970-01-01: days, Monday-starting weeks, months,
+    quarters and years. Each level is summed from the one below it
+    (weeks from days, months from days, quarters from months, years from
+    quarters), and nothing is turned into text until display.
+    """
+    levels = {'daily': daily.rename(columns={'day': 'period'}).reset_index(drop=True)}
+    days = levels['daily']['period'].to_numpy(dtype=np.int64)
+    levels['weekly'] = _roll(levels['daily'], (days + 3) // 7)  # 1970-01-01 was a Thursday
+    months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    levels['monthly'] = _roll(levels['daily'], months)
+    levels['quarterly'] = _roll(levels['monthly'], levels['monthly']['period'] // 3)
+    levels['yearly'] = _roll(levels['quarterly'], levels['quarterly']['period'] // 4)
+    return levels
+
+
+def period_axis(level, periods):
+    """Display values for integer periods, in chronological order"""
+    periods = np.asarray(periods, dtype=np.int64)
+    if level == 'daily':
+        return from_day(periods)
+    if level == 'weekly':
+        return from_day(periods * 7 - 3)  # week start (Monday)
+    if level == 'monthly':
+        return pd.to_datetime(periods.astype('datetime64[M]')).strftime('%b-%Y')
+    if level == 'quarterly':
+        return [f"Q{q % 4 + 1}-{1970 + q // 4}" for q in periods]
+    return (1970 + periods).astype(str)
@@ -0,0 +1,156 @@
+"""Production entry point: the dashboard served by several worker processes.
+
+    python serve.py --workers 4 --threads 8 --port 8050
+
+The orders are loaded and enriched once into a column store (colstore.py),
+or taken from the store cache if the CSV has not changed. Every worker
+memory-maps that store instead of reading the CSV itself, so one copy of
+the data sits in the OS page cache however many workers run. Finished
+chart figures go to a cache directory shared by all workers.
+
+gunicorn is used when it is installed; otherwise a small pre-fork server
+from the standard library runs the same WSGI app. Both need fork(), so
+this runs on Linux/macOS only.
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+from colstore import save_frame
+from predictor import SalesPredictor
+from preprocess import load_orders, prepare_orders
+
+DATA_FILE = 'data/sales_data_sample.csv'
+CACHE_DIR = 'data/.cache'
+
+
+class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass  # one line per callback request would swamp the console
+
+
+def prepare_state(state_dir):
+    """Write the shared order store, the model and the shared figure cache; returns the env for workers"""
+    try:
+        orders_dir = prepare_orders(DATA_FILE, CACHE_DIR)
+    except (OSError, ValueError):
+        orders_dir = os.path.join(state_dir, 'orders')
+        save_frame(load_orders(DATA_FILE), orders_dir)  # sample orders
+    SalesPredictor().prepare()  # trained once here, not in every worker on its first prediction
+    figures_dir = os.path.join(state_dir, 'figures')
+    shutil.rmtree(figures_dir, ignore_errors=True)  # figures from an earlier run may be for other data
+    os.makedirs(figures_dir)
+    return {'SALES_SHARED_DATA': orders_dir, 'SALES_FIGURE_CACHE': figures_dir}
+
+
+def run_gunicorn(args):
+    return subprocess.call(['gunicorn', '--workers', str(args.workers), '--threads', str(args.threads),
+                            '--bind', f'{args.host}:{args.port}', 'dashboard_app:server'])
+
+
+def serve_worker(sock, host, port):
+    signal.signal(signal.SIGTERM, lambda *_: os._exit(0))
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C reaches the parent, which stops the workers
+    # Imported after fork, so each worker maps the shared store rather than inheriting a copy
+    from dashboard_app import server
+    httpd = ThreadingWSGIServer((host, port), QuietHandler, bind_and_activate=False)
+    httpd.socket = sock
+    httpd.server_name, httpd.server_port = host, port
+    httpd.setup_environ()
+    httpd.set_app(server)
+    httpd.serve_forever()
+
+
+def run_prefork(args):
+    """Bind once, fork the workers; they all accept() on the same listening socket"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(1024)
+    workers = {}  # pid -> start time
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                serve_worker(sock, args.host, args.port)
+            except BaseException:
+                traceback.print_exc()
+            os._exit(1)
+        workers[pid] = time.monotonic()
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(args.workers):
+        spawn()
+    print(f"Serving on http://{args.host}:{args.port} with {args.workers} workers")
+    while workers:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        started = workers.pop(pid, None)
+        if stopping or started is None:
+            continue
+        if time.monotonic() - started < 10:
+            print("A worker exited during startup; stopping.", file=sys.stderr)
+            stop()
+            continue
+        spawn()  # replace a worker that died
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Enterprise Sales Analytics Suite with several workers")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--threads', type=int, default=8,
+                        help="request threads per gunicorn worker (the built-in server uses a thread per request)")
+    parser.add_argument('--state-dir', help="where the shared order store and figure cache are kept "
+                                            "(default: a temporary directory removed on exit)")
+    parser.add_argument('--live', action='append', default=[], metavar='SOURCE',
+                        help="tail new orders from a CSV/JSONL drop file or an SQLite table; may be repeated")
+    parser.add_argument('--no-gunicorn', action='store_true', help="use the built-in pre-fork server")
+    args = parser.parse_args()
+
+    state_dir = args.state_dir or tempfile.mkdtemp(prefix='sales-dashboard-')
+    os.environ.update(prepare_state(state_dir))
+    if args.live:
+        os.environ['SALES_LIVE_SOURCES'] = json.dumps(args.live)
+    try:
+        if not args.no_gunicorn and shutil.which('gunicorn'):
+            return run_gunicorn(args)
+        run_prefork(args)
+    finally:
+        if not args.state_dir:
+            shutil.rmtree(state_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
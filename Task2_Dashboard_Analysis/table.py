@@ -0,0 +1,153 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Columns shown in the transaction table
+TABLE_COLUMNS = ['ORDERNUMBER', 'ORDERDATE', 'COUNTRY', 'PRODUCTLINE',
+                 'QUANTITYORDERED', 'SALES', 'PROFIT', 'PROFIT_MARGIN']
+# Also kept per row so the sidebar filters can be applied to the table's own rows
+FILTER_COLUMNS = ['CUSTOMER_SEGMENT']
+DEFAULT_SORT = [{'column_id': 'ORDERDATE', 'direction': 'desc'}]
+
+# DataTable filter_query terms, e.g. "{COUNTRY} icontains usa" or "{SALES} >= 5000"
+FILTER_TERM = re.compile(r'\{(?P<column>[^}]+)\}\s*(?P<op>[is]?(?:contains|datestartswith|eq|ne|lt|le|gt|ge)|[<>!]=?|=)\s*(?P<value>.*)')
+OPERATORS = {'=': 'eq', '!=': 'ne', '<': 'lt', '<=': 'le', '>': 'gt', '>=': 'ge'}
+WORD_OPERATORS = ('contains', 'datestartswith', 'eq', 'ne', 'lt', 'le', 'gt', 'ge')
+
+
+def _parse_value(text):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in '"\'`':
+        return text[1:-1].replace('\\' + text[0], text[0])
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def parse_filter_query(query):
+    """DataTable filter_query as [(column, operator, value)]; unknown terms are ignored"""
+    terms = []
+    for part in (query or '').split(' && '):
+        match = FILTER_TERM.match(part.strip())
+        if match:
+            op = OPERATORS.get(match['op'], match['op'])
+            if op[0] in 'is' and op[1:] in WORD_OPERATORS:
+                op = op[1:]  # case-(in)sensitive variants; text matching is case-insensitive here
+            terms.append((match['column'], op, _parse_value(match['value'])))
+    return terms
+
+
+class OrderTable:
+    """Row source for the server-side paged, sorted and filtered DataTable.
+
+    Each sortable column gets one stable argsort of the whole dataset, made
+    once (ORDERDATE at build time, the others on first use). A filtered,
+    sorted view is that permutation restricted to the filter mask, so a page
+    of any view is just a slice of it.
+    """
+
+    def __init__(self, df, orders=None):
+        self.frame = df[TABLE_COLUMNS + FILTER_COLUMNS].reset_index(drop=True)
+        for col in ('COUNTRY', 'PRODUCTLINE'):
+            # Text filters then test each distinct value once
+            self.frame[col] = self.frame[col].astype('category')
+        # Column orders may come ready-made, e.g. from another table over the same rows
+        self.orders = dict(orders or {})
+        self.date_text = None
+        self.order('ORDERDATE')
+
+    def __len__(self):
+        return len(self.frame)
+
+    def append(self, df):
+        """Add newly ingested orders, merging them into the column orders already built"""
+        new = df[TABLE_COLUMNS + FILTER_COLUMNS].reset_index(drop=True)
+        start = len(self.frame)
+        for col in ('COUNTRY', 'PRODUCTLINE'):
+            values = self.frame[col]
+            unseen = set(new[col].dropna()) - set(values.cat.categories)
+            if unseen:
+                # Keep categories sorted so sorting by the codes stays alphabetical
+                values = values.cat.set_categories(sorted(set(values.cat.categories) | unseen))
+                self.orders.pop(col, None)
+            self.frame[col] = values
+            new[col] = pd.Categorical(new[col], categories=values.cat.categories)
+        self.frame = pd.concat([self.frame, new], ignore_index=True)
+        if self.date_text is not None:
+            self.date_text = pd.concat([self.date_text, new['ORDERDATE'].dt.strftime('%Y-%m-%d')],
+                                       ignore_index=True)
+        for col, order in list(self.orders.items()):
+            values = self.frame[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.cat.codes
+            values = values.to_numpy()
+            if pd.isna(values).any():
+                del self.orders[col]  # rebuilt on next use
+                continue
+            # Binary-search each new row into the existing order instead of re-sorting everything
+            new_order = np.argsort(values[start:], kind='stable')
+            slots = np.searchsorted(values[order], values[start:][new_order], side='right')
+            self.orders[col] = np.insert(order, slots, new_order + start)
+
+    def order(self, column):
+        """Row positions sorted ascending by `column` (missing values last)"""
+        if column not in self.orders:
+            self.orders[column] = self.frame[column].sort_values(kind='stable').index.to_numpy()
+        return self.orders[column]
+
+    def _text(self, column):
+        values = self.frame[column]
+        if column == 'ORDERDATE':
+            if self.date_text is None:
+                self.date_text = values.dt.strftime('%Y-%m-%d')
+            return self.date_text
+        return values.astype(str)
+
+    def _term_mask(self, column, op, value):
+        values = self.frame[column]
+        if op in ('contains', 'datestartswith'):
+            text = str(value).lower() if op == 'contains' else str(value)
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                categories = values.cat.categories.astype(str)
+                hits = (categories.str.lower().str.contains(text, regex=False) if op == 'contains'
+                        else categories.str.startswith(text))
+                return np.append(np.asarray(hits), False)[values.cat.codes.to_numpy()]
+            text_values = self._text(column)
+            if op == 'contains':
+                return text_values.str.lower().str.contains(text, regex=False).to_numpy(dtype=bool)
+            return text_values.str.startswith(text).to_numpy(dtype=bool)
+        if column == 'ORDERDATE':
+            values = self._text(column)
+            value = str(value)
+        elif isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(str)
+            value = str(value)
+        compare = {'eq': values.__eq__, 'ne': values.__ne__, 'lt': values.__lt__,
+                   'le': values.__le__, 'gt': values.__gt__, 'ge': values.__ge__}[op]
+        try:
+            return compare(value).to_numpy(dtype=bool)
+        except TypeError:
+            # e.g. a text value typed into a numeric column matches nothing
+            return np.zeros(len(values), dtype=bool)
+
+    def view(self, mask, sort_by=None, filter_query=''):
+        """Row positions that pass `mask` and the table filter, in display order"""
+        mask = np.asarray(mask, dtype=bool)
+        if len(mask) < len(self.frame):
+            # Rows ingested after the mask was computed are not part of that selection
+            mask = np.concatenate([mask, np.zeros(len(self.frame) - len(mask), dtype=bool)])
+        for column, op, value in parse_filter_query(filter_query):
+            if column in TABLE_COLUMNS:
+                mask = mask & self._term_mask(column, op, value)
+        sort = (sort_by or DEFAULT_SORT)[0]
+        positions = self.order(sort['column_id'])
+        positions = positions[mask[positions]]
+        return positions[::-1] if sort['direction'] == 'desc' else positions
+
+    def page(self, positions, page_current, page_size):
+        rows = self.frame.iloc[positions[page_current * page_size:(page_current + 1) * page_size]][TABLE_COLUMNS].copy()
+        rows['ORDERDATE'] = rows['ORDERDATE'].dt.strftime('%Y-%m-%d')
+        for col in ('COUNTRY', 'PRODUCTLINE'):
+            rows[col] = rows[col].astype(object)
+        return rows.to_dict('records')
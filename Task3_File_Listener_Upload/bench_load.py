@@ -0,0 +1,140 @@
+"""Load throughput of the listener's insert paths on uploads/sales_data_sample.csv scaled up.
+
+    python bench_load.py --rows 1000000 10000000
+
+For each size the sample is repeated (with order numbers shifted so they
+stay unique) into one CSV, then loaded into a fresh database by:
+
+  legacy  the original path: the whole file in one DataFrame, df.to_sql,
+          default SQLite settings
+  stream  insert_file_to_db: chunked reads, executemany in one
+          transaction, WAL and the tuned pragmas
+  bulk    the same in bulk-load mode (synchronous=OFF, temporary data
+          on disk, indexes rebuilt after the load)
+
+Each run is a separate process, so the peak RSS reported is its own. The
+table gets an index on --index first, as a table that is queried would.
+legacy needs the whole file in memory and is skipped above --legacy-max-rows.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import listener
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads', 'sales_data_sample.csv')
+MODES = ['legacy', 'stream', 'bulk']
+BLOCK_COPIES = 40  # sample copies written per block while scaling
+
+
+def scaled_csv(rows, directory):
+    """The sample repeated to `rows` rows, written once and reused"""
+    path = os.path.join(directory, f'sales_{rows}.csv')
+    if os.path.exists(path):
+        return path
+    sample = pd.read_csv(SAMPLE, encoding='latin1')
+    block = pd.concat([sample] * BLOCK_COPIES, ignore_index=True)
+    # Shift each copy's order numbers past the previous copy's, so (ORDERNUMBER, ORDERLINENUMBER) stays unique
+    span = sample['ORDERNUMBER'].max() - sample['ORDERNUMBER'].min() + 1
+    copy = block.index // len(sample)
+    written = 0
+    with open(path + '.tmp', 'w', encoding='latin1', newline='') as f:
+        while written < rows:
+            part = block.head(rows - written).copy()
+            part['ORDERNUMBER'] += (copy[:len(part)] + written // len(sample)) * span
+            part.to_csv(f, header=written == 0, index=False)
+            written += len(part)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def prepare_table(db_name, table_name, index):
+    """An empty table with the file's columns and one index, like a table already in use"""
+    if not index:
+        return
+    columns = pd.read_csv(SAMPLE, encoding='latin1', nrows=100)
+    conn = sqlite3.connect(db_name)
+    listener.ensure_table(conn.cursor(), table_name, columns)
+    conn.execute(f'CREATE INDEX "{table_name}_{index}" ON "{table_name}" ("{index}")')
+    conn.commit()
+    conn.close()
+
+
+def legacy_insert(file_path, db_name):
+    """insert_file_to_db as it was before streaming: read everything, then df.to_sql"""
+    df = pd.read_csv(file_path, encoding='latin1')
+    conn = sqlite3.connect(db_name)
+    df.to_sql(listener.clean_table_name(file_path), conn, if_exists='append', index=False)
+    conn.close()
+
+
+def run_one(mode, file_path, db_name):
+    """Load the file once in this process; returns seconds"""
+    started = time.perf_counter()
+    if mode == 'legacy':
+        legacy_insert(file_path, db_name)
+    else:
+        listener.DB_NAME = db_name
+        listener.insert_file_to_db(file_path, keys={}, bulk=mode == 'bulk')
+    return time.perf_counter() - started
+
+
+def measure(mode, file_path, directory, index):
+    db_name = os.path.join(directory, f'{mode}.db')
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_name + suffix):
+            os.remove(db_name + suffix)
+    prepare_table(db_name, listener.clean_table_name(file_path), index)
+    output = subprocess.run([sys.executable, __file__, '--run', mode, '--file', file_path, '--db', db_name],
+                            check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    conn = sqlite3.connect(db_name)
+    result['rows'] = conn.execute(f'SELECT COUNT(*) FROM "{listener.clean_table_name(file_path)}"').fetchone()[0]
+    conn.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the listener's SQLite load paths")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000], help="table sizes to load")
+    parser.add_argument('--modes', nargs='+', default=MODES, choices=MODES)
+    parser.add_argument('--index', default='COUNTRY', help="column indexed before loading ('' for none)")
+    parser.add_argument('--legacy-max-rows', type=int, default=2_000_000,
+                        help="largest size the legacy path is run at")
+    parser.add_argument('--dir', help="where the scaled CSVs and databases go (default: a temporary directory)")
+    parser.add_argument('--run', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--file', help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        seconds = run_one(args.run, args.file, args.db)
+        print(json.dumps({'seconds': seconds, 'peak_rss_mb': listener.peak_rss_mb()}))
+        return
+
+    directory = args.dir or tempfile.mkdtemp(prefix='bench-load-')
+    os.makedirs(directory, exist_ok=True)
+    print(f"{'rows':>12}{'mode':>8}{'seconds':>10}{'rows/s':>12}{'peak RSS MB':>13}")
+    for rows in args.rows:
+        file_path = scaled_csv(rows, directory)
+        for mode in args.modes:
+            if mode == 'legacy' and rows > args.legacy_max_rows:
+                print(f"{rows:>12,}{mode:>8}   skipped: needs the whole file in memory")
+                continue
+            result = measure(mode, file_path, directory, args.index)
+            assert result['rows'] == rows, result
+            peak = f"{result['peak_rss_mb']:.0f}" if result['peak_rss_mb'] is not None else "n/a"
+            print(f"{rows:>12,}{mode:>8}{result['seconds']:>10.1f}{rows / result['seconds']:>12,.0f}"
+                  f"{peak:>13}", flush=True)
+    print(f"files and databases in {directory}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,61 @@
 import os
+import sys
 import time
+import json
+import queue
+import hashlib
+import signal
 import sqlite3
+import argparse
+import datetime
+import itertools
+import threading
+import multiprocessing
 import pandas as pd
 import re
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
 
 # === Config ===
 UPLOAD_DIR = "uploads"
 DB_NAME = "database.db"
+CHUNK_ROWS = 50_000       # rows held in memory at a time while ingesting a file
+PROGRESS_EVERY = 5        # seconds between progress lines for a long file
+STABLE_SECONDS = 0.5      # size and mtime unchanged this long: a file nothing is writing is complete
+PAUSE_SECONDS = 2         # the same for a file being written, where closes are not reported
+QUIET_SECONDS = 10        # the same for a file being written whose close never came
+POLL_SECONDS = 0.1        # how often pending files are checked
+SHUTDOWN_SECONDS = 15     # on Ctrl-C, how long files still being written get to settle and be loaded
+# Names used while a file is still being written (browsers, rsync, office suites, editors)
+TEMP_PREFIXES = ('.', '~$')
+TEMP_SUFFIXES = ('.part', '.partial', '.tmp', '.temp', '.crdownload', '.download', '.filepart', '.swp', '~')
+QUEUE_SIZE = 1000         # files waiting for a parse worker before new events block
+PENDING_CHUNKS = 2        # parsed chunks a worker may hold ahead of the writer
+LEDGER_TABLE = "_ingest_ledger"
+# Tuning for the writer's connection. WAL lets the workers' ledger lookups read while it writes,
+# and with WAL, synchronous=NORMAL is still safe against corruption. A large load grows the WAL
+# to the size of the new data; after the checkpoint it is cut back to journal_size_limit.
+PRAGMAS = {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'cache_size': -64 * 1024, 'temp_store': 'MEMORY',
+           'journal_size_limit': 64 * 1024 * 1024}
+# Bulk-load mode (--bulk): no fsync at all. An OS crash or power cut during a load can corrupt
+# the database, so use it for loads that can be redone from the files. Temporary data goes to
+# disk, because rebuilding an index on a large table would otherwise sort it all in memory.
+BULK_PRAGMAS = dict(PRAGMAS, synchronous='OFF', temp_store='FILE')
+# Parameters bound per INSERT statement (SQLite before 3.32 allows at most 999)
+MAX_PARAMS = 5000 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+# Natural keys: files for these tables are upserted by key instead of appended
+TABLE_KEYS = {
+    'sales_data_sample': ['ORDERNUMBER', 'ORDERLINENUMBER'],
+}
+
+# sqlite3 cannot bind pandas Timestamps (datetime columns, Excel dates) or times;
+# store them as ISO text, the way df.to_sql did
+sqlite3.register_adapter(pd.Timestamp, lambda value: value.isoformat(sep=' '))
+sqlite3.register_adapter(datetime.time, lambda value: value.strftime('%H:%M:%S.%f'))
 
 # === Utility ===
 def clean_table_name(filename):
@@ -17,82 +64,612 @@ def clean_table_name(filename):
     name = re.sub(r'\W+', '_', name)  # replace non-word chars
     return name.lower()
 
-def read_file(file_path):
-    ext = os.path.splitext(file_path)[1].lower()
+def is_json_lines(file_path):
+    """True for line-delimited JSON: the first line is a complete record on its own.
+
+    A one-line column-oriented document ({"col": {"0": ...}}) is not a record.
+    """
+    with open(file_path, encoding='utf-8') as f:
+        first = f.readline().strip()
     try:
-        if ext == '.csv':
-            return pd.read_csv(file_path, encoding='latin1')
-        elif ext in ['.xls', '.xlsx']:
-            return pd.read_excel(file_path)
-        elif ext == '.json':
-            return pd.read_json(file_path)
-        else:
-            print(f"[!] Skipping unsupported file: {file_path}")
-            return None
-    except Exception as e:
-        print(f"[X] Failed to read {file_path}: {e}")
+        record = json.loads(first)
+    except ValueError:
+        return False
+    return isinstance(record, dict) and not all(isinstance(value, dict) for value in record.values())
+
+def read_excel_chunks(file_path, chunk_rows):
+    """Stream the first sheet row by row from a read-only workbook"""
+    from openpyxl import load_workbook
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [name if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+        while True:
+            batch = list(itertools.islice(rows, chunk_rows))
+            if not batch:
+                break
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        workbook.close()
+
+def read_chunks(file_path, chunk_rows=CHUNK_ROWS):
+    """The file's rows as DataFrames of at most chunk_rows rows (None for unsupported files).
+
+    CSV is read with chunked read_csv, .xlsx through openpyxl's read-only
+    mode and line-delimited JSON with chunked read_json, so memory use does
+    not grow with the file. Legacy .xls and whole-document JSON can only be
+    parsed in one piece and come back as a single chunk.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == '.csv':
+        return pd.read_csv(file_path, encoding='latin1', chunksize=chunk_rows)
+    elif ext == '.xlsx':
+        return read_excel_chunks(file_path, chunk_rows)
+    elif ext == '.xls':
+        return iter([pd.read_excel(file_path)])
+    elif ext in ['.json', '.jsonl']:
+        if ext == '.jsonl' or is_json_lines(file_path):
+            return pd.read_json(file_path, lines=True, chunksize=chunk_rows)
+        return iter([pd.read_json(file_path)])
+    else:
+        print(f"[!] Skipping unsupported file: {file_path}")
         return None
 
-# === Main DB Insert ===
-def insert_file_to_db(file_path):
-    df = read_file(file_path)
-    if df is None:
+def sql_type(dtype):
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    elif pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT'
+
+def ensure_table(cursor, table_name, df):
+    """Create the table from the chunk's columns, or add columns it has not seen yet"""
+    existing = [row[1] for row in cursor.execute(f'PRAGMA table_info("{table_name}")')]
+    if not existing:
+        sql_columns = [f'"{col}" {sql_type(dtype)}' for col, dtype in df.dtypes.items()]
+        cursor.execute(f'CREATE TABLE "{table_name}" ({", ".join(sql_columns)})')
         return
+    for col, dtype in df.dtypes.items():
+        if col not in existing:
+            cursor.execute(f'ALTER TABLE "{table_name}" ADD COLUMN "{col}" {sql_type(dtype)}')
+
+def quoted(columns):
+    return ', '.join(f'"{col}"' for col in columns)
+
+def column_values(col):
+    """The column as plain Python values, with NaN/NaT as NULL"""
+    missing = col.isna().to_numpy()
+    if not missing.any():
+        return col.tolist()
+    values = col.to_numpy(dtype=object, copy=True)
+    values[missing] = None
+    return values.tolist()
+
+def insert_sql(table_name, columns, count, key=None):
+    """INSERT of `count` rows at once; with a key, new keys are inserted and only changed rows updated"""
+    row = '(' + ', '.join('?' for _ in columns) + ')'
+    sql = f'INSERT INTO "{table_name}" ({quoted(columns)}) VALUES ' + ', '.join([row] * count)
+    if key:
+        others = [col for col in columns if col not in key]
+        if others:
+            sql += (f' ON CONFLICT ({quoted(key)}) DO UPDATE SET '
+                    + ', '.join(f'"{col}" = excluded."{col}"' for col in others)
+                    + ' WHERE NOT (' + ' AND '.join(f'"{col}" IS excluded."{col}"' for col in others) + ')')
+        else:
+            sql += f' ON CONFLICT ({quoted(key)}) DO NOTHING'
+    return sql
+
+def insert_chunk(cursor, table_name, df, key=None):
+    """Write a chunk with executemany, several rows per statement.
+
+    The statement text is the same for every full batch, so sqlite3's
+    statement cache prepares it once per file.
+    """
+    columns = list(df.columns)
+    per = max(1, MAX_PARAMS // len(columns))
+    rows = list(zip(*(column_values(col) for _, col in df.items())))
+    full = len(rows) - len(rows) % per
+    cursor.executemany(insert_sql(table_name, columns, per, key),
+                       (tuple(itertools.chain.from_iterable(rows[i:i + per])) for i in range(0, full, per)))
+    if full < len(rows):
+        cursor.execute(insert_sql(table_name, columns, len(rows) - full, key),
+                       tuple(itertools.chain.from_iterable(rows[full:])))
+
+def ensure_key(cursor, table_name, key):
+    """The unique index an upsert needs; fails if the table already holds duplicate keys"""
+    try:
+        cursor.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "{table_name}_key" ON "{table_name}" ({quoted(key)})')
+    except sqlite3.IntegrityError:
+        raise ValueError(f"table '{table_name}' already has duplicate {'/'.join(key)} rows; "
+                         f"remove them before upserting by key")
+
+def connect(db_name, bulk=False):
+    """A writer connection with the tuning profile (or the bulk-load one) applied"""
+    conn = sqlite3.connect(db_name)
+    for name, value in (BULK_PRAGMAS if bulk else PRAGMAS).items():
+        conn.execute(f'PRAGMA {name} = {value}')
+    return conn
 
+def defer_indexes(cursor, table_name, keep):
+    """Drop the table's indexes except `keep`; returns the SQL to create them again after the load"""
+    indexes = cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? "
+                             "AND sql IS NOT NULL AND name != ?", (table_name, keep)).fetchall()
+    for name, _ in indexes:
+        cursor.execute(f'DROP INDEX "{name}"')
+    return [sql for _, sql in indexes]
+
+# === Ingestion Ledger ===
+def content_hash(path, block_size=1 << 20):
+    """SHA-256 of the file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def ensure_ledger(cursor):
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS "{LEDGER_TABLE}" (
+            path TEXT, size INTEGER, mtime_ns INTEGER, sha256 TEXT,
+            table_name TEXT, rows INTEGER, written INTEGER, ingested_at TEXT
+        )''')
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS "{LEDGER_TABLE}_content" ON "{LEDGER_TABLE}" (table_name, sha256)')
+
+def ledger_entry(cursor, table_name, sha256):
+    """When this content was last loaded into the table, or None"""
+    row = cursor.execute(f'SELECT ingested_at FROM "{LEDGER_TABLE}" WHERE table_name = ? AND sha256 = ? '
+                         f'ORDER BY ingested_at DESC LIMIT 1', (table_name, sha256)).fetchone()
+    return row[0] if row else None
+
+def identify(file_path, db_name):
+    """(source, reason): the file's size, mtime and content hash, and why to skip it (None to ingest).
+
+    Looks the file up in the ledger through a read-only connection, so
+    already-ingested content is skipped before any parsing. A file with the
+    path, size and mtime of a ledger entry is not even hashed. The writer
+    checks the hash again before committing.
+    """
+    st = os.stat(file_path)
     table_name = clean_table_name(file_path)
+    try:
+        conn = sqlite3.connect(f'file:{db_name}?mode=ro', uri=True)
+    except sqlite3.Error:
+        conn = None  # no database yet
+    try:
+        if conn is not None:
+            try:
+                row = conn.execute(f'SELECT sha256 FROM "{LEDGER_TABLE}" WHERE path = ? AND size = ? AND mtime_ns = ? '
+                                   f'AND table_name = ? LIMIT 1',
+                                   (file_path, st.st_size, st.st_mtime_ns, table_name)).fetchone()
+            except sqlite3.OperationalError:
+                conn, row = None, None  # no ledger yet
+            if row:
+                return (st.st_size, st.st_mtime_ns, row[0]), f"unchanged since it was loaded into '{table_name}'"
+        sha256 = content_hash(file_path)
+        source = (st.st_size, st.st_mtime_ns, sha256)
+        if conn is not None:
+            when = ledger_entry(conn.cursor(), table_name, sha256)
+            if when:
+                return source, f"same content already loaded into '{table_name}' at {when}"
+        return source, None
+    finally:
+        if conn is not None:
+            conn.close()
+
+def peak_rss_mb():
+    """The listener process's peak RSS so far, or None where it cannot be read.
+
+    A high-water mark for the whole process, not a per-file figure, and it
+    leaves out parse worker processes.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+# === Main DB Insert ===
+class AlreadyIngested(Exception):
+    pass
+
+def write_file(conn, file_path, chunks, source, key=None, bulk=False):
+    """Load a file's chunks into its table in a single transaction; returns (table, rows, rows written).
 
+    `source` is the file's (size, mtime_ns, sha256) from identify(). The
+    ledger entry is written in the same transaction as the rows, so a file
+    is recorded exactly when its rows are in. With a key the rows are
+    upserted, and rows written counts only new and changed ones. In bulk
+    mode the table's other indexes are dropped for the load and rebuilt
+    once at the end, instead of being updated row by row.
+    Raises AlreadyIngested if the content was loaded in the meantime.
+    """
+    table_name = clean_table_name(file_path)
+    cursor = conn.cursor()
+    cursor.execute('BEGIN')
+    rows = 0
+    changes = conn.total_changes
+    deferred = None
+    last_report = time.perf_counter()
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        # Build column types dynamically
-        columns = df.columns
-        types = df.dtypes
-
-        sql_columns = []
-        for col, dtype in zip(columns, types):
-            if pd.api.types.is_integer_dtype(dtype):
-                sql_type = 'INTEGER'
-            elif pd.api.types.is_float_dtype(dtype):
-                sql_type = 'REAL'
-            else:
-                sql_type = 'TEXT'
-            sql_columns.append(f'"{col}" {sql_type}')
-
-        # Create table
-        create_query = f'''
-            CREATE TABLE IF NOT EXISTS "{table_name}" (
-                {', '.join(sql_columns)}
-            );
-        '''
-        cursor.execute(create_query)
+        ensure_ledger(cursor)
+        when = ledger_entry(cursor, table_name, source[2])
+        if when:
+            raise AlreadyIngested(f"same content already loaded into '{table_name}' at {when}")
+        for chunk in chunks:
+            chunk.columns = [str(col) for col in chunk.columns]
+            ensure_table(cursor, table_name, chunk)
+            if key:
+                ensure_key(cursor, table_name, key)
+            if bulk and deferred is None:
+                deferred = defer_indexes(cursor, table_name, keep=f'{table_name}_key')
+            insert_chunk(cursor, table_name, chunk, key)
+            rows += len(chunk)
+            if time.perf_counter() - last_report >= PROGRESS_EVERY:
+                last_report = time.perf_counter()
+                print(f"    … {rows:,} rows from {os.path.basename(file_path)}")
+        written = conn.total_changes - changes
+        for sql in deferred or []:
+            cursor.execute(sql)
+        cursor.execute(f'INSERT INTO "{LEDGER_TABLE}" VALUES (?, ?, ?, ?, ?, ?, ?, datetime(\'now\'))',
+                       (file_path, *source, table_name, rows, written))
         conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return table_name, rows, written
+
+def report(table_name, rows, written, elapsed):
+    detail = f" ({written:,} new or changed)" if written != rows else ""
+    peak = peak_rss_mb()
+    memory = f", listener peak RSS so far {peak:.0f} MB" if peak is not None else ""
+    print(f"[✓] Loaded {rows:,} rows into table '{table_name}'{detail} in {elapsed:.1f}s "
+          f"({rows / elapsed if elapsed else 0:,.0f} rows/s{memory})")
+
+def report_skip(file_path, reason):
+    print(f"[=] Skipping {file_path}: {reason}")
 
-        # Insert data
-        df.to_sql(table_name, conn, if_exists='append', index=False)
-        conn.close()
-        print(f"[✓] Inserted {len(df)} rows into table '{table_name}'")
+def insert_file_to_db(file_path, chunk_rows=CHUNK_ROWS, keys=TABLE_KEYS, conn=None, bulk=False):
+    """Stream one file into its table, holding only one chunk in memory.
 
+    Pass `conn` (from connect()) to keep one connection across files.
+    """
+    started = time.perf_counter()
+    try:
+        source, reason = identify(file_path, DB_NAME)
+        if reason:
+            report_skip(file_path, reason)
+            return
+        chunks = read_chunks(file_path, chunk_rows)
+        if chunks is None:
+            return
+        own = conn is None
+        if own:
+            conn = connect(DB_NAME, bulk)
+        try:
+            result = write_file(conn, file_path, chunks, source, keys.get(clean_table_name(file_path)), bulk)
+        finally:
+            if own:
+                conn.close()
+    except AlreadyIngested as e:
+        report_skip(file_path, e)
+        return
     except Exception as e:
         print(f"[X] Error uploading {file_path} → {e}")
+        return
+    report(*result, time.perf_counter() - started)
+
+# === Ingestion Pool ===
+def parse_worker(jobs, out, started, index, chunk_rows, db_name):
+    """Parse queued files into chunks for the writer; runs as a thread or a process.
+
+    Each file is sent on this worker's own queue as ('start', (job, path)), then
+    ('source', (size, mtime_ns, sha256)) and its ('chunk', df) messages,
+    ending with ('end', None), ('skip', reason or None) or ('error', message).
+    `started` tells the writer which worker to read next.
+    """
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        path = job[1]
+        started.put(index)
+        out.put(('start', job))
+        try:
+            source, reason = identify(path, db_name)
+            if reason:
+                out.put(('skip', reason))
+                continue
+            chunks = read_chunks(path, chunk_rows)
+            if chunks is None:
+                out.put(('skip', None))
+                continue
+            out.put(('source', source))
+            for chunk in chunks:
+                out.put(('chunk', chunk))
+            out.put(('end', None))
+        except Exception as e:
+            out.put(('error', str(e)))
+
+def process_worker(*args):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C is handled by the listener, which drains the queue
+    parse_worker(*args)
+
+class ParseError(Exception):
+    pass
+
+class IngestPool:
+    """Parse workers feeding a single SQLite writer.
+
+    Files are parsed concurrently by `workers` threads, or processes with
+    processes=True (for parsing that holds the GIL, such as Excel). Workers
+    hash each file first and skip content the ledger already holds. One
+    writer thread owns the only database connection and writes one file at
+    a time, each in its own transaction, so writes never contend for the
+    database. Every queue is bounded: a worker holds at most
+    PENDING_CHUNKS chunks ahead of the writer, and submit() blocks once
+    queue_size files are waiting.
+    """
+
+    def __init__(self, workers=None, processes=False, queue_size=QUEUE_SIZE,
+                 chunk_rows=CHUNK_ROWS, db_name=None, keys=TABLE_KEYS, bulk=False):
+        self.db_name = db_name or DB_NAME
+        self.bulk = bulk
+        self.keys = keys  # table -> natural key columns, for upserts
+        # submission id -> {'path', 'state': queued/parsing/writing/done/skipped/failed, 'rows', 'error'};
+        # a file dropped again is a new submission with its own entry
+        self.status = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        workers = workers or os.cpu_count() or 1
+        if processes:
+            context = multiprocessing.get_context('spawn')
+            make_queue, make_worker, target = context.Queue, context.Process, process_worker
+        else:
+            make_queue, make_worker, target = queue.Queue, threading.Thread, parse_worker
+        self.jobs = make_queue(queue_size)
+        self.started = make_queue()
+        self.outputs = [make_queue(PENDING_CHUNKS) for _ in range(workers)]
+        self.workers = [make_worker(target=target, daemon=True,
+                                    args=(self.jobs, out, self.started, index, chunk_rows, self.db_name))
+                        for index, out in enumerate(self.outputs)]
+        for worker in self.workers:
+            worker.start()
+        self.writer = threading.Thread(target=self._write_all, daemon=True)
+        self.writer.start()
+
+    def submit(self, path):
+        """Queue a file for ingestion and return its submission id; blocks while the queue is full"""
+        with self.lock:
+            job = next(self.ids)
+            self.status[job] = {'path': path, 'state': 'queued', 'rows': 0, 'error': None}
+        self.jobs.put((job, path))
+        return job
+
+    def _set(self, job, **fields):
+        with self.lock:
+            self.status[job].update(fields)
+
+    def _stream(self, out, message):
+        """A file's chunks from its worker's queue, starting with `message`"""
+        while True:
+            kind, value = message
+            if kind == 'chunk':
+                yield value
+            elif kind == 'error':
+                raise ParseError(value)
+            else:
+                return
+            message = out.get()
+
+    def _write_all(self):
+        conn = connect(self.db_name, self.bulk)
+        try:
+            while True:
+                index = self.started.get()
+                if index is None:
+                    return
+                self._write_one(conn, self.outputs[index])
+        finally:
+            conn.close()
+
+    def _write_one(self, conn, out):
+        _, (job, path) = out.get()
+        self._set(job, state='parsing')
+        kind, value = out.get()
+        if kind == 'skip':
+            if value:
+                report_skip(path, value)
+            self._set(job, state='skipped')
+            return
+        if kind == 'error':
+            self._set(job, state='failed', error=value)
+            print(f"[X] Error uploading {path} → {value}")
+            return
+        self._set(job, state='writing')
+        started = time.perf_counter()
+        stream = self._stream(out, out.get())
+        try:
+            result = write_file(conn, path, stream, value, self.keys.get(clean_table_name(path)), self.bulk)
+        except Exception as e:
+            # Read past the rest of this file so the next one starts cleanly
+            for _ in stream:
+                pass
+            if isinstance(e, AlreadyIngested):
+                report_skip(path, e)
+                self._set(job, state='skipped')
+            else:
+                self._set(job, state='failed', error=str(e))
+                print(f"[X] Error uploading {path} → {e}")
+            return
+        self._set(job, state='done', rows=result[1])
+        report(*result, time.perf_counter() - started)
+
+    def summary(self):
+        """Submissions counted by state"""
+        with self.lock:
+            states = [entry['state'] for entry in self.status.values()]
+        return {state: states.count(state) for state in dict.fromkeys(states)}
+
+    def close(self):
+        """Finish every queued file, then stop the workers and the writer"""
+        for _ in self.workers:
+            self.jobs.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.started.put(None)
+        self.writer.join()
+
+# === Write Completion ===
+def is_temporary(path):
+    """True for names that mark a file still being written; it is picked up once renamed"""
+    name = os.path.basename(path)
+    return name.startswith(TEMP_PREFIXES) or name.lower().endswith(TEMP_SUFFIXES)
+
+def file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+class ReadinessTracker:
+    """Works out when a dropped file is completely written, and hands it on once.
+
+    A file is ready as soon as its writer closes it (close-after-write
+    events, on Linux) or it is renamed into place from a temporary name.
+    Otherwise it is ready once its size and mtime have stopped changing:
+    for STABLE_SECONDS if no writer was seen (a file moved in whole), for
+    PAUSE_SECONDS if one was and the platform does not report closes, and
+    for QUIET_SECONDS if one was but its close never came. Repeated
+    events for a path are folded together, and a file is handed on again
+    only if it has changed since.
+    """
+
+    def __init__(self, ready, close_events):
+        self.ready = ready                # called with each path that is ready
+        self.close_events = close_events  # whether the observer reports closes after writing
+        self.pending = {}                 # path -> [signature, time it last changed, writer seen]
+        self.handed = {}                  # path -> signature it was handed on with
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.poller = threading.Thread(target=self._poll, daemon=True)
+        self.poller.start()
+
+    def touch(self, path, writing=False):
+        """The file appeared or changed; it may still be being written. Returns True for a new file."""
+        if is_temporary(path):
+            return False
+        signature = file_signature(path)
+        with self.lock:
+            if signature is None or self.handed.get(path) == signature:
+                return False
+            entry = self.pending.get(path)
+            if entry is None:
+                self.pending[path] = [signature, time.monotonic(), writing]
+                return True
+            if entry[0] != signature:
+                entry[0], entry[1] = signature, time.monotonic()
+            entry[2] = entry[2] or writing
+            return False
+
+    def complete(self, path):
+        """The writer closed the file, or it was renamed into place: it is written"""
+        if is_temporary(path):
+            return
+        with self.lock:
+            self.pending.pop(path, None)
+        self._hand_on(path)
+
+    def _hand_on(self, path):
+        signature = file_signature(path)
+        with self.lock:
+            if signature is None or self.handed.get(path) == signature:
+                return
+            self.handed[path] = signature
+        self.ready(path)
+
+    def _poll(self):
+        while not self.stopped.wait(POLL_SECONDS):
+            now, due = time.monotonic(), []
+            with self.lock:
+                for path, entry in list(self.pending.items()):
+                    signature = file_signature(path)
+                    if signature is None:
+                        del self.pending[path]  # deleted before it was finished
+                    elif signature != entry[0]:
+                        entry[0], entry[1] = signature, now
+                    elif now - entry[1] >= self._settle(entry[2]):
+                        del self.pending[path]
+                        due.append(path)
+            for path in due:
+                self._hand_on(path)
+
+    def _settle(self, writing):
+        if not writing:
+            return STABLE_SECONDS
+        return QUIET_SECONDS if self.close_events else PAUSE_SECONDS
+
+    def stop(self, timeout=0):
+        """Stop, first giving files still settling up to `timeout` seconds to be handed on.
+
+        Returns the paths that were never handed on.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.lock:
+                if not self.pending:
+                    break
+            time.sleep(POLL_SECONDS)
+        self.stopped.set()
+        self.poller.join()
+        with self.lock:
+            left = sorted(self.pending)
+            self.pending.clear()
+        return left
 
 # === Watchdog Handler ===
 class UploadHandler(FileSystemEventHandler):
+    """Feeds file events to the readiness tracker; nothing blocks the observer thread"""
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+
     def on_created(self, event):
-        if event.is_directory:
-            return
-        print(f"[📂] New file detected: {event.src_path}")
-        time.sleep(1)  # wait for file copy to complete
-        insert_file_to_db(event.src_path)
+        if not event.is_directory and self.tracker.touch(event.src_path):
+            print(f"[📂] New file detected: {event.src_path}")
+
+    def on_opened(self, event):
+        if not event.is_directory:
+            self.tracker.touch(event.src_path, writing=True)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.tracker.touch(event.src_path, writing=True)
+
+    def on_closed(self, event):
+        if not event.is_directory:
+            self.tracker.complete(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory and not is_temporary(event.dest_path):
+            print(f"[📂] New file detected: {event.dest_path}")
+            self.tracker.complete(event.dest_path)
 
 # === Start Listener ===
-def start_listener():
+def start_listener(workers=None, processes=False, queue_size=QUEUE_SIZE, keys=TABLE_KEYS, bulk=False):
     if not os.path.exists(UPLOAD_DIR):
         os.makedirs(UPLOAD_DIR)
-    print(f"📡 Listening for new files in '{UPLOAD_DIR}'...\n")
+    pool = IngestPool(workers, processes, queue_size, keys=keys, bulk=bulk)
+    print(f"📡 Listening for new files in '{UPLOAD_DIR}' with {len(pool.workers)} "
+          f"parse {'processes' if processes else 'threads'}...\n")
 
-    event_handler = UploadHandler()
     observer = Observer()
+    # inotify reports when a writer closes a file; the other observers only report changes
+    tracker = ReadinessTracker(pool.submit, close_events=type(observer).__name__ == 'InotifyObserver')
+    event_handler = UploadHandler(tracker)
     observer.schedule(event_handler, UPLOAD_DIR, recursive=False)
     observer.start()
 
@@ -101,8 +678,32 @@ def start_listener():
             time.sleep(2)
     except KeyboardInterrupt:
         observer.stop()
-        print("\n🛑 Listener stopped.")
+        print("\n🛑 Listener stopped; finishing files still being written and queued files "
+              "(Ctrl-C again to abort)...")
     observer.join()
+    left = tracker.stop(SHUTDOWN_SECONDS)
+    pool.close()
+    counts = [f"{count} {state}" for state, count in pool.summary().items()]
+    if left:
+        counts.append(f"{len(left)} not ingested")
+    print("Files:", ", ".join(counts) or "none")
+    for path in left:
+        print(f"[!] Not ingested, still being written at shutdown: {path}")
 
 if __name__ == "__main__":
-    start_listener()
+    parser = argparse.ArgumentParser(description="Load files dropped into the uploads folder into SQLite")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="parse workers")
+    parser.add_argument('--processes', action='store_true',
+                        help="parse in worker processes instead of threads")
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE,
+                        help="files waiting for a worker before new events block")
+    parser.add_argument('--key', action='append', default=[], metavar='TABLE=COL[,COL...]',
+                        help="upsert files for TABLE by these key columns instead of appending; may be repeated")
+    parser.add_argument('--bulk', action='store_true',
+                        help="bulk-load mode: no fsync, and indexes rebuilt after each load (faster, not crash-safe)")
+    args = parser.parse_args()
+    keys = dict(TABLE_KEYS)
+    for spec in args.key:
+        table, _, columns = spec.partition('=')
+        keys[table] = columns.split(',')
+    start_listener(args.workers, args.processes, args.queue_size, keys, args.bulk)